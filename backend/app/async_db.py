@@ -0,0 +1,368 @@
+# app/async_db.py
+"""
+Async read path built on the bundled mysql.connector.aio driver.
+
+Flask runs every `async def` view inside its own short-lived event loop, so aio
+connections can't be kept between requests from there. Instead each process
+starts one background event loop that owns a small aio connection pool; async
+views hand their coroutines to it with `await run(...)`. While one query waits on
+MySQL the loop keeps serving others, and a view that needs several independent
+rows can `asyncio.gather` them so their round trips overlap.
+
+Reads here always go to the primary, not to MYSQL_REPLICA_HOSTS: nearly all of
+them fill the tag-versioned result cache (app/cache.py), and a row loaded from a
+lagging replica just after an edit would be cached stale for every session until
+it expires, which per-session read-your-writes stickiness can't prevent.
+
+With DB_DRIVER=oracle there is no aio driver: the same repository functions run
+their queries on the regular (oracledb-backed) pool from a thread executor of
+ASYNC_DB_POOL_SIZE threads, so reads and writes hit the same database.
+"""
+import asyncio
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import mysql.connector.aio
+
+from app import cache, drivers, singleflight
+from app.instrumentation import current_route, record
+from app.search import query_terms
+from app.utils import (
+    BREAKER_BACKOFF_BASE,
+    BREAKER_BACKOFF_MAX,
+    BREAKER_THRESHOLD,
+    DB_CONFIG,
+    CircuitBreaker,
+    init_db_connection,
+)
+
+ASYNC_POOL_SIZE = int(os.getenv("ASYNC_DB_POOL_SIZE", "10"))
+ASYNC_TIMEOUT = float(os.getenv("ASYNC_DB_TIMEOUT", "10"))
+
+
+class AsyncConnectionPool:
+    """Bounded pool of aio connections; must only be used from its own event loop."""
+
+    def __init__(self, config, max_size=10):
+        self.config = dict(config)
+        self.max_size = max_size
+        self._idle = []
+        self._slots = asyncio.Semaphore(max_size)
+        self.breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_BACKOFF_BASE, BREAKER_BACKOFF_MAX)
+
+    async def acquire(self):
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if conn.is_socket_connected():
+                    return conn
+                await self._close(conn)
+            return await self._connect()
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def _connect(self):
+        self.breaker.before_connect()
+        try:
+            conn = await mysql.connector.aio.connect(**self.config)
+        except BaseException:
+            # a refused socket is a plain OSError here, and a cancelled half-open
+            # probe must still end the probe: every failed attempt counts
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return conn
+
+    async def release(self, conn, discard=False):
+        try:
+            if not discard and conn.in_transaction:
+                await conn.rollback()
+        except Exception:
+            discard = True
+        if discard:
+            await self._close(conn)
+        else:
+            self._idle.append(conn)
+        self._slots.release()
+
+    @staticmethod
+    async def _close(conn):
+        try:
+            await conn.close()
+        except Exception:
+            pass
+
+
+# Flask endpoint that scheduled the current coroutine (for query instrumentation)
+_route = contextvars.ContextVar("route", default="async")
+
+_loop = None
+_pool = None
+_executor = None
+_loop_pid = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop, _pool, _executor, _loop_pid
+    pid = os.getpid()
+    if _loop is None or _loop_pid != pid:
+        with _loop_lock:
+            if _loop is None or _loop_pid != pid:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="async-db", daemon=True)
+                thread.start()
+                if drivers.DB_DRIVER == "oracle":
+                    _pool = None
+                    _executor = ThreadPoolExecutor(ASYNC_POOL_SIZE, thread_name_prefix="async-db-sync")
+                else:
+                    _pool = AsyncConnectionPool(DB_CONFIG, max_size=ASYNC_POOL_SIZE)
+                    _executor = None
+                _loop, _loop_pid = loop, pid
+    return _loop
+
+
+def _reset_after_fork():
+    # the loop thread doesn't survive fork; the child starts its own on first use
+    global _loop, _pool, _executor, _loop_pid, _loop_lock
+    _loop_lock = threading.Lock()
+    _loop = _pool = _executor = _loop_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+async def _with_route(coro, route):
+    _route.set(route)
+    return await coro
+
+
+def run(coro):
+    """Schedule `coro` on the DB loop; returns an awaitable for the caller's loop."""
+    future = asyncio.run_coroutine_threadsafe(_with_route(coro, current_route()), _get_loop())
+    return asyncio.wait_for(asyncio.wrap_future(future), ASYNC_TIMEOUT)
+
+
+def stats():
+    """Async pool size and breaker state (empty until the first async query in this process)."""
+    pool = _pool
+    if pool is None:
+        return {"via": "sync pool"} if _executor is not None else {}
+    return {"max_size": pool.max_size, "idle": len(pool._idle), "breaker": pool.breaker.stats()}
+
+
+def run_sync(coro):
+    """Blocking variant of run() for scripts and benchmarks."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result(ASYNC_TIMEOUT)
+
+
+async def _query(sql, params=None, one=False):
+    # concurrent identical reads share one round trip
+    key = ("async", sql, tuple(params or ()), one)
+    return await singleflight.do_async(key, lambda: _execute(sql, params, one))
+
+
+async def _execute(sql, params, one):
+    if _executor is not None:
+        return await asyncio.get_running_loop().run_in_executor(_executor, _execute_blocking, sql, params, one)
+    pool = _pool
+    conn = await pool.acquire()
+    failed = False
+    rows = []
+    start = time.perf_counter()
+    try:
+        cur = await conn.cursor(dictionary=True)
+        try:
+            await cur.execute(sql, params or ())
+            rows = await cur.fetchall()
+            return (rows[0] if rows else None) if one else rows
+        finally:
+            await cur.close()
+    except BaseException:
+        # errors, but also the cancellation from run()'s timeout mid-fetch: don't
+        # hand a connection with unread result packets to the next query
+        failed = True
+        raise
+    finally:
+        record(sql, params, time.perf_counter() - start, len(rows), _route.get(), error=failed)
+        await pool.release(conn, discard=failed)
+
+
+def _execute_blocking(sql, params, one):
+    # DB_DRIVER=oracle: a checkout from the regular pool (timed by its instrumented cursors)
+    pool = init_db_connection()
+    conn = pool.get_connection()
+    failed = False
+    try:
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(sql, params or ())
+            rows = cur.fetchall()
+            return (rows[0] if rows else None) if one else rows
+        finally:
+            cur.close()
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        pool.release(conn, discard=failed)
+
+
+async def fetch_one(sql, params=None):
+    return await _query(sql, params, one=True)
+
+
+async def fetch_all(sql, params=None):
+    return await _query(sql, params)
+
+
+# ---- repository: read queries used by the async views ----
+# results are cached per table/row (app/cache.py) and dropped by the write handlers
+
+async def _cached(sql, params, tags, one=False):
+    return await cache.cached_async(sql, params, tags, lambda: _query(sql, params, one))
+
+
+_VERSION_SQL = {t: "SELECT id, updated_at FROM %s WHERE id = %%s" % t for t in ("blogs", "courses", "quizzes")}
+
+
+async def get_version(table, row_id):
+    """(id, updated_at) of one row: enough to answer a conditional GET (app/conditional.py)."""
+    return await _cached(_VERSION_SQL[table], (row_id,), ["%s:%s" % (table, row_id)], one=True)
+
+
+async def get_blog(blog_id):
+    return await _cached(
+        "SELECT id, title, slug, content, content_html, excerpt, word_count, read_minutes, "
+        "image_url, image_alt, image_caption, author_id, created_at, updated_at "
+        "FROM blogs WHERE id = %s",
+        (blog_id,),
+        ["blogs:%s" % blog_id],
+        one=True,
+    )
+
+
+async def get_blog_by_slug(slug):
+    # not result-cached: the slug -> id map in app/cache.py sits in front of this
+    return await _query(
+        "SELECT id, title, slug, content, content_html, excerpt, word_count, read_minutes, "
+        "image_url, image_alt, image_caption, author_id, created_at, updated_at "
+        "FROM blogs WHERE slug = %s",
+        (slug,),
+        one=True,
+    )
+
+
+async def list_blogs(limit, after=None):
+    """
+    Newest first, keyset-paginated on (created_at, id) via idx_blogs_created_id.
+    `after` is the (created_at, id) of the last row of the previous page. Fetches
+    limit + 1 rows so the caller knows whether there is a next page.
+    """
+    # summary only: no LONGTEXT content; excerpt / read time are precomputed (app/render.py)
+    columns = (
+        "SELECT id, title, slug, excerpt, word_count, read_minutes, "
+        "image_url, image_alt, image_caption, author_id, created_at FROM blogs "
+    )
+    if after is None:
+        return await _cached(
+            columns + "ORDER BY created_at DESC, id DESC LIMIT %s",
+            (limit + 1,),
+            ["blogs"],
+        )
+    created_at, blog_id = after
+    # expanded form of (created_at, id) < (%s, %s), which MySQL turns into an index range
+    return await _cached(
+        columns + "WHERE created_at < %s OR (created_at = %s AND id < %s) "
+        "ORDER BY created_at DESC, id DESC LIMIT %s",
+        (created_at, created_at, blog_id, limit + 1),
+        ["blogs"],
+    )
+
+
+async def search_blogs(q, limit, offset):
+    """
+    FULLTEXT match on (title, content), best score first; limit + 1 rows so the
+    caller can tell whether there is another page. Content is fetched only for
+    the rows on this page, to cut snippets from.
+    """
+    if drivers.DB_DRIVER == "oracle":
+        # Oracle Text index ft_blogs_content (db/oracle_schema.sql); any word matches, {} escapes operators
+        text = " ACCUM ".join("{%s}" % t for t in query_terms(q))
+        return await _cached(
+            "SELECT id, title, slug, excerpt, read_minutes, image_url, author_id, created_at, content, "
+            "SCORE(1) AS score FROM blogs WHERE CONTAINS(content, %s, 1) > 0 "
+            "ORDER BY score DESC, id DESC LIMIT %s, %s",
+            (text, offset, limit + 1),
+            ["blogs"],
+        )
+    return await _cached(
+        "SELECT id, title, slug, excerpt, read_minutes, image_url, author_id, created_at, content, "
+        "MATCH(title, content) AGAINST (%s IN NATURAL LANGUAGE MODE) AS score "
+        "FROM blogs WHERE MATCH(title, content) AGAINST (%s IN NATURAL LANGUAGE MODE) "
+        "ORDER BY score DESC, id DESC LIMIT %s, %s",
+        (q, q, offset, limit + 1),
+        ["blogs"],
+    )
+
+
+async def get_blog_summaries(blog_ids):
+    """List-style rows for the given ids (primary-key lookups), in no particular order."""
+    if not blog_ids:
+        return []
+    return await _cached(
+        "SELECT id, title, slug, excerpt, word_count, read_minutes, "
+        "image_url, image_alt, image_caption, author_id, created_at FROM blogs "
+        "WHERE id IN (%s)" % ", ".join(["%s"] * len(blog_ids)),
+        tuple(blog_ids),
+        ["blogs:%s" % b for b in blog_ids],
+    )
+
+
+async def get_related_blogs(blog_id, limit):
+    """Precomputed neighbours (app/related.py), best first: one range read on blog_related's primary key."""
+    return await _cached(
+        "SELECT b.id, b.title, b.slug, b.excerpt, b.read_minutes, b.image_url, b.image_alt, "
+        "b.author_id, b.created_at, r.score "
+        "FROM blog_related r JOIN blogs b ON b.id = r.related_id "
+        "WHERE r.blog_id = %s ORDER BY r.score DESC, r.related_id LIMIT %s",
+        (blog_id, limit),
+        # "blogs" too: the rows carry other blogs' titles / slugs
+        ["blog_related:%s" % blog_id, "blogs"],
+    )
+
+
+async def get_trending(k):
+    """The k best blog_trending scores (app/trending.py), best first: a range scan of idx_trending_score.
+    Not result-cached: scores change on every flush, and app/trending.py keeps its own short-lived copy."""
+    return await fetch_all("SELECT blog_id, score FROM blog_trending ORDER BY score DESC LIMIT %s", (k,))
+
+
+async def get_course(course_id):
+    return await _cached(
+        "SELECT id, title, description, rating, thumbnail_url, video_url, content, created_at, updated_at "
+        "FROM courses WHERE id = %s",
+        (course_id,),
+        ["courses:%s" % course_id],
+        one=True,
+    )
+
+
+async def list_courses():
+    # summary only: leave the LONGTEXT content column out of list responses
+    return await _cached(
+        "SELECT id, title, description, rating, thumbnail_url, video_url, created_at "
+        "FROM courses ORDER BY id",
+        None,
+        ["courses"],
+    )
+
+
+async def list_quizzes():
+    return await _cached("SELECT id, title, created_at FROM quizzes ORDER BY id", None, ["quizzes"])
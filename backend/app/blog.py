@@ -1,7 +1,18 @@
 # app/blog_routes.py
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from mysql.connector import Error
-from app.utils import get_db_connection   # adjust if your DB helper module name is different
+from mysql.connector.errors import PoolError
+from app.utils import DatabaseUnavailable, get_db_connection, get_read_connection, mark_connection_lost, transaction   # adjust if your DB helper module name is different
+from app import async_db, related, revisions, trending, view_counter
+from app.blog_import import import_ndjson
+from app.updates import BLOG_UPDATE, NOT_FOUND, UPDATED, content_value, slug_value
+from app.cache import blog_slugs, invalidate
+from app.conditional import conditional_response, is_conditional, not_modified, not_modified_response
+from app.pagination import decode_cursor, encode_cursor, parse_limit
+from app.render import blog_fields
+from app.search import SEARCH_MAX_PAGE, query_terms, snippet
+from app.streaming import RowStream, ndjson_response
 
 blog_bp = Blueprint("blog_bp", __name__)
 
@@ -31,28 +42,39 @@ def create_blog():
 
     if not title or not slug:
         return jsonify({"error": "title and slug are required"}), 400
+    try:
+        slug = slug_value(slug)
+        content = content_value(content)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = get_db_connection()
     try:
         cur = conn.cursor()
         try:
+            # html / excerpt / word count / read time are computed once here, not per read
+            derived = blog_fields(content)
             sql = """
-                INSERT INTO blogs (title, slug, content, image_url, image_alt, image_caption, author_id)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
+                INSERT INTO blogs (title, slug, content, content_html, excerpt, word_count, read_minutes,
+                                   image_url, image_alt, image_caption, author_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
             """
-            cur.execute(sql, (title, slug, content, image_url, image_alt, image_caption, author_id))
-            blog_id = cur.lastrowid
-            # ensure commit in case autocommit is off
-            try:
-                conn.commit()
-            except Exception:
-                pass
+            # the blog and its first revision are written together
+            with transaction(conn):
+                cur.execute(sql, (title, slug, content, derived["content_html"], derived["excerpt"],
+                                  derived["word_count"], derived["read_minutes"],
+                                  image_url, image_alt, image_caption, author_id))
+                blog_id = cur.lastrowid
+                revisions.record_initial(conn, blog_id, content)
+            invalidate("blogs", blog_id)   # drop cached reads of this table/row
+            related.schedule(blog_id)      # neighbours are refreshed in the background
 
             return jsonify({
                 "message": "blog created",
                 "blog_id": blog_id
             }), 201
         except Error as e:
+            mark_connection_lost(e)
             # Duplicate slug / unique constraint error in MySQL has errno 1062
             if getattr(e, "errno", None) == 1062:
                 return jsonify({"error": "slug already exists"}), 409
@@ -63,46 +85,106 @@ def create_blog():
         return jsonify({"error": "db connection error", "details": str(e)}), 500
 
 
+@blog_bp.route("/import", methods=["POST"])
+def import_blogs():
+    """
+    Bulk create blogs from NDJSON in the request body: one create_blog object per
+    line (Content-Type: application/x-ndjson). The body is streamed and written
+    in chunked transactions, see app/blog_import.py. Bad lines (invalid JSON,
+    missing title/slug, duplicate slug) are reported and skipped.
+    Returns {"lines", "imported", "failed", "errors": [{line, slug, error, errno?}],
+    "errors_truncated", "aborted"}: 200, or 500 if a database error stopped it.
+    """
+    conn = get_db_connection()
+    report = import_ndjson(conn, request.stream)
+    if report.imported:
+        invalidate("blogs")
+    if report.aborted is not None:
+        mark_connection_lost(report.aborted)
+        return jsonify(report.as_dict()), 500
+    return jsonify(report.as_dict()), 200
+
+
+@blog_bp.route("/", methods=["GET"])
+async def list_blogs():
+    """
+    List blogs, newest first, without their content.
+    Query args: limit (default 20, max 100), cursor (next_cursor of the previous page).
+    Returns {"blogs": [...], "next_cursor": "..." or null}.
+    """
+    try:
+        limit = parse_limit(request.args.get("limit"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    after = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            created_at, blog_id = decode_cursor(cursor, 2)
+            after = (datetime.fromisoformat(created_at), int(blog_id))
+        except (TypeError, ValueError):
+            return jsonify({"error": "invalid cursor"}), 400
+
+    try:
+        rows = await async_db.run(async_db.list_blogs(limit, after))
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return jsonify({"blogs": rows, "next_cursor": next_cursor}), 200
+
+
 @blog_bp.route("/<int:blog_id>", methods=["PUT", "PATCH"])
 def update_blog(blog_id):
     """
     Partial update a blog. Provide any subset of fields in JSON:
     title, slug, content, image_url, image_alt, image_caption, author_id
+    Fields whose value is unchanged are not written (see app/updates.py).
     """
     data = request.get_json() or {}
-    allowed_fields = ["title", "slug", "content", "image_url", "image_alt", "image_caption", "author_id"]
-    updates = []
-    params = []
-
-    for f in allowed_fields:
-        if f in data:
-            updates.append(f + " = %s")
-            params.append(data.get(f))
-
-    if not updates:
-        return jsonify({"error": "no updatable fields provided"}), 400
-
-    params.append(blog_id)
-    sql = f"UPDATE blogs SET {', '.join(updates)} WHERE id = %s"
+    try:
+        values = BLOG_UPDATE.validate(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = get_db_connection()
     try:
-        cur = conn.cursor()
-        try:
-            cur.execute(sql, tuple(params))
-            if cur.rowcount == 0:
-                return jsonify({"error": "blog not found"}), 404
+        if "content" in values:
+            # content edits also add a revision (app/revisions.py), in the same transaction
+            before = {}
+            with transaction(conn):
+                if not revisions.lock_blog(conn, blog_id):
+                    return jsonify({"error": "blog not found"}), 404
+                result = BLOG_UPDATE.apply(conn, blog_id, values, before)
+                if result == UPDATED and before["content"] != values["content"]:
+                    revisions.record(conn, blog_id, before["content"], values["content"])
+        else:
+            result = BLOG_UPDATE.apply(conn, blog_id, values)
+        if result == NOT_FOUND:
+            return jsonify({"error": "blog not found"}), 404
+        if result == UPDATED:
             try:
                 conn.commit()
             except Exception:
                 pass
-            return jsonify({"message": "blog updated", "blog_id": blog_id}), 200
-        except Error as e:
-            if getattr(e, "errno", None) == 1062:
-                return jsonify({"error": "slug already exists"}), 409
-            return jsonify({"error": str(e)}), 500
-        finally:
-            cur.close()
+            invalidate("blogs", blog_id)
+            if "slug" in values:
+                blog_slugs.forget_id(blog_id)
+            if "title" in values or "content" in values:
+                related.schedule(blog_id)
+        return jsonify({"message": "blog updated", "blog_id": blog_id, "changed": result == UPDATED}), 200
+    except Error as e:
+        mark_connection_lost(e)
+        if getattr(e, "errno", None) == 1062:
+            return jsonify({"error": "slug already exists"}), 409
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "db connection error", "details": str(e)}), 500
 
@@ -119,14 +201,225 @@ def delete_blog(blog_id):
             cur.execute("DELETE FROM blogs WHERE id = %s", (blog_id,))
             if cur.rowcount == 0:
                 return jsonify({"error": "blog not found"}), 404
+            # counts are in their own table without an FK; flushes only upsert ids still in blogs
+            cur.execute("DELETE FROM blog_views WHERE blog_id = %s", (blog_id,))
             try:
                 conn.commit()
             except Exception:
                 pass
+            invalidate("blogs", blog_id)
+            blog_slugs.forget_id(blog_id)
+            trending.remove(blog_id)
+            view_counter.forget(blog_id)
             return jsonify({"message": "blog deleted", "blog_id": blog_id}), 200
         except Error as e:
+            mark_connection_lost(e)
             return jsonify({"error": str(e)}), 500
         finally:
             cur.close()
     except Exception as e:
         return jsonify({"error": "db connection error", "details": str(e)}), 500
+
+
+def _count_view(blog_id):
+    view_counter.hit(blog_id)   # buffered, see app/view_counter.py
+    trending.record(blog_id, "view")
+
+
+@blog_bp.route("/<int:blog_id>", methods=["GET"])
+async def get_blog(blog_id):
+    """
+    Fetch a blog by id (async read path, see app/async_db.py).
+    Sends ETag / Last-Modified; a conditional request for an unchanged blog gets
+    304 after a (id, updated_at) lookup, without loading the content.
+    """
+    try:
+        if is_conditional():
+            version = await async_db.run(async_db.get_version("blogs", blog_id))
+            if version and not_modified("blogs", version):
+                _count_view(blog_id)
+                return not_modified_response("blogs", version)
+        row = await async_db.run(async_db.get_blog(blog_id))
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+    if not row:
+        return jsonify({"error": "blog not found"}), 404
+    _count_view(blog_id)
+    return conditional_response("blogs", row)
+
+
+@blog_bp.route("/<int:blog_id>/related", methods=["GET"])
+async def related_blogs(blog_id):
+    """
+    Related posts, most similar first, from the precomputed index (app/related.py).
+    Query arg: limit (default and max RELATED_COUNT).
+    Returns {"blog_id", "results": [{id, title, slug, ..., score}]}.
+    """
+    try:
+        limit = parse_limit(request.args.get("limit"), default=related.RELATED_COUNT, maximum=related.RELATED_COUNT)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        rows = await async_db.run(async_db.get_related_blogs(blog_id, limit))
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+    for row in rows:
+        row["score"] = round(float(row["score"]), 4)
+    return jsonify({"blog_id": blog_id, "results": rows}), 200
+
+
+@blog_bp.route("/<int:blog_id>/revisions", methods=["GET"])
+def list_blog_revisions(blog_id):
+    """
+    Revision history of a blog, newest first:
+    [{revision, kind (snapshot|delta), content_bytes, stored_bytes, created_at}]
+    """
+    conn = get_read_connection()
+    try:
+        rows = revisions.list_revisions(conn, blog_id)
+    except Error as e:
+        mark_connection_lost(e)
+        return jsonify({"error": str(e)}), 500
+    if not rows:
+        return jsonify({"error": "blog not found or has no revisions"}), 404
+    return jsonify({"blog_id": blog_id, "revisions": rows}), 200
+
+
+@blog_bp.route("/<int:blog_id>/revisions/<int:revision>", methods=["GET"])
+def get_blog_revision(blog_id, revision):
+    """
+    Content of one revision, rebuilt from the nearest snapshot plus deltas.
+    """
+    conn = get_read_connection()
+    try:
+        content = revisions.reconstruct(conn, blog_id, revision)
+    except Error as e:
+        mark_connection_lost(e)
+        return jsonify({"error": str(e)}), 500
+    if content is None:
+        return jsonify({"error": "revision not found"}), 404
+    return jsonify({"blog_id": blog_id, "revision": revision, "content": content}), 200
+
+
+@blog_bp.route("/search", methods=["GET"])
+async def search_blogs():
+    """
+    Full-text search over title + content, best match first.
+    Query args: q (required), limit (default 10, max 50), page (1-based).
+    Returns {"results": [{id, title, slug, ..., score, snippet}], "page", "has_more"};
+    snippets are HTML-escaped with the matched words in <mark>.
+    """
+    q = (request.args.get("q") or "").strip()
+    terms = query_terms(q)
+    if not terms:
+        return jsonify({"error": "q is required"}), 400
+    if len(q) > 200:
+        return jsonify({"error": "q must be at most 200 characters"}), 400
+    try:
+        limit = parse_limit(request.args.get("limit"), default=10, maximum=50)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        page = int(request.args.get("page") or 1)
+    except ValueError:
+        return jsonify({"error": "page must be an integer"}), 400
+    if page < 1 or page > SEARCH_MAX_PAGE:
+        return jsonify({"error": "page must be between 1 and %d" % SEARCH_MAX_PAGE}), 400
+
+    try:
+        rows = await async_db.run(async_db.search_blogs(q, limit, (page - 1) * limit))
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+
+    results = []
+    for row in rows[:limit]:
+        row["snippet"] = snippet(row.pop("content"), terms)
+        row["score"] = round(float(row["score"]), 4)
+        results.append(row)
+    return jsonify({"results": results, "page": page, "has_more": len(rows) > limit}), 200
+
+
+@blog_bp.route("/trending", methods=["GET"])
+async def trending_blogs():
+    """
+    Most popular blogs right now: view counts decayed with a half-life, shared
+    by all workers and up to a flush interval behind (app/trending.py), best
+    first. Query arg: limit (default 20, max TRENDING_TOP_K).
+    Returns {"results": [{id, title, slug, ..., score}]}.
+    """
+    try:
+        limit = parse_limit(request.args.get("limit"), default=20, maximum=trending.TRENDING_TOP_K)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    try:
+        ranked = await trending.top(limit)
+        rows = await async_db.run(async_db.get_blog_summaries([blog_id for blog_id, _ in ranked]))
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+    by_id = {row["id"]: row for row in rows}
+    results = []
+    for blog_id, score in ranked:
+        row = by_id.get(blog_id)
+        if row is not None:   # deleted through another worker
+            results.append(dict(row, score=round(score, 4)))
+    return jsonify({"results": results}), 200
+
+
+@blog_bp.route("/<slug>", methods=["GET"])
+async def get_blog_by_slug(slug):
+    """
+    Fetch a blog by its slug (the public post URL).
+    The slug -> id map (app/cache.py) plus the per-row result cache usually
+    answer this without touching MySQL; update_blog / delete_blog drop the entry.
+    """
+    try:
+        blog_id = blog_slugs.get(slug)
+        if blog_id is not None:
+            row = await async_db.run(async_db.get_blog(blog_id))
+            # another worker may have renamed or deleted it since we cached the id
+            if row and row["slug"] == slug:
+                _count_view(blog_id)
+                return conditional_response("blogs", row)
+            blog_slugs.discard(slug)
+        row = await async_db.run(async_db.get_blog_by_slug(slug))
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+    if not row:
+        return jsonify({"error": "blog not found"}), 404
+    blog_slugs.put(slug, row["id"])
+    _count_view(row["id"])
+    return conditional_response("blogs", row)
+
+
+@blog_bp.route("/export", methods=["GET"])
+def export_blogs():
+    """
+    Export every blog, content included, as NDJSON (one blog per line).
+    Rows are streamed from an unbuffered cursor, see app/streaming.py.
+    """
+    rows = RowStream(
+        "SELECT id, title, slug, content, content_html, excerpt, word_count, read_minutes, "
+        "image_url, image_alt, image_caption, author_id, created_at, updated_at "
+        "FROM blogs ORDER BY id"
+    )
+    return ndjson_response(rows)
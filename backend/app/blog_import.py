@@ -0,0 +1,199 @@
+# app/blog_import.py
+"""
+Bulk blog import from NDJSON (POST /blog/import).
+
+The request body is read one line at a time, so memory stays flat however big
+the archive is. Each line is a blog object with the create_blog fields. Rows are
+validated (title and slug required) and get their derived fields (app/render.py).
+They are then written in chunks of IMPORT_CHUNK_SIZE: one transaction per chunk,
+with one executemany for the blogs and one for their first revisions.
+
+Bad rows don't stop the import:
+  - invalid JSON, a missing title or slug, a reserved slug (see slug_value) or
+    a field of the wrong type (e.g. non-string content) is reported for its line;
+  - a slug that already exists, or appears twice in the file, is reported as
+    1062 / "slug already exists" before the chunk is written;
+  - if the chunk insert still fails (a concurrent insert took a slug, a value
+    is too long, ...), the chunk is rolled back and retried row by row, so only
+    the offending rows are reported.
+Any other database error (a lost connection) stops the import: chunks already
+committed stay committed, and the report says where it stopped.
+
+Related-post lists are not refreshed per row; run `python -m app.related`
+after a large import.
+"""
+import json
+import os
+
+from mysql.connector import Error
+
+from app import revisions
+from app.render import blog_fields
+from app.updates import content_value, slug_value
+from app.utils import LOST_CONNECTION_ERRNOS, transaction
+
+IMPORT_CHUNK_SIZE = int(os.getenv("BLOG_IMPORT_CHUNK_SIZE", "500"))
+# per-row errors listed in the response (the rest are only counted)
+IMPORT_MAX_ERRORS = 1000
+
+FIELDS = ("title", "slug", "content", "content_html", "excerpt", "word_count", "read_minutes",
+          "image_url", "image_alt", "image_caption", "author_id")
+INSERT_SQL = "INSERT INTO blogs (%s) VALUES (%s)" % (", ".join(FIELDS), ", ".join(["%s"] * len(FIELDS)))
+
+
+class ImportReport:
+    def __init__(self):
+        self.lines = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.aborted = None   # the Error that stopped the import, if any
+
+    def error(self, line, slug, message, errno=None):
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            entry = {"line": line, "slug": slug, "error": message}
+            if errno is not None:
+                entry["errno"] = errno
+            self.errors.append(entry)
+
+    def as_dict(self):
+        return {
+            "lines": self.lines,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+            "aborted": str(self.aborted) if self.aborted is not None else None,
+        }
+
+
+def _type_error(data):
+    """Message for the first field with the wrong JSON type, None if all are fine."""
+    if not isinstance(data["title"], str):
+        return "title must be a string"
+    try:
+        content_value(data.get("content"))
+    except ValueError as e:
+        return str(e)
+    for name in ("image_url", "image_alt", "image_caption"):
+        if data.get(name) is not None and not isinstance(data[name], str):
+            return "%s must be a string" % name
+    author_id = data.get("author_id")
+    if author_id is not None and (isinstance(author_id, bool) or not isinstance(author_id, int)):
+        return "author_id must be an integer"
+    return None
+
+
+def _parse(line_no, raw, report):
+    """(line_no, row values) for a valid line, None otherwise (error recorded)."""
+    try:
+        data = json.loads(raw)
+    except ValueError as e:
+        report.error(line_no, None, "invalid JSON: %s" % e)
+        return None
+    if not isinstance(data, dict):
+        report.error(line_no, None, "line must be a JSON object")
+        return None
+    title, slug = data.get("title"), data.get("slug")
+    if not title or not slug:
+        report.error(line_no, slug, "title and slug are required")
+        return None
+    try:
+        slug_value(slug)
+    except ValueError as e:
+        report.error(line_no, slug if isinstance(slug, str) else None, str(e))
+        return None
+    problem = _type_error(data)
+    if problem:
+        report.error(line_no, slug, problem)
+        return None
+    content = data.get("content")
+    derived = blog_fields(content)
+    return line_no, (title, slug, content, derived["content_html"], derived["excerpt"],
+                     derived["word_count"], derived["read_minutes"], data.get("image_url"),
+                     data.get("image_alt"), data.get("image_caption"), data.get("author_id"))
+
+
+def _existing_slugs(cur, slugs):
+    cur.execute("SELECT slug FROM blogs WHERE slug IN (%s)" % ", ".join(["%s"] * len(slugs)), tuple(slugs))
+    return {r[0] for r in cur.fetchall()}
+
+
+def _ids_by_slug(cur, slugs):
+    cur.execute("SELECT id, slug FROM blogs WHERE slug IN (%s)" % ", ".join(["%s"] * len(slugs)), tuple(slugs))
+    return {slug: blog_id for blog_id, slug in cur.fetchall()}
+
+
+def _write_chunk(conn, chunk, report):
+    cur = conn.cursor()
+    try:
+        taken = _existing_slugs(cur, [values[1] for _, values in chunk])
+        rows, seen = [], set()
+        for line_no, values in chunk:
+            slug = values[1]
+            if slug in taken or slug in seen:
+                report.error(line_no, slug, "slug already exists", 1062)
+            else:
+                seen.add(slug)
+                rows.append((line_no, values))
+        if not rows:
+            return
+        try:
+            with transaction(conn):
+                cur.executemany(INSERT_SQL, [values for _, values in rows])
+                # slugs are unique, so they give back the new ids whatever the auto-increment mode
+                ids = _ids_by_slug(cur, [values[1] for _, values in rows])
+                revisions.record_initial_many(conn, [(ids[values[1]], values[2]) for _, values in rows])
+            report.imported += len(rows)
+        except Error as e:
+            if getattr(e, "errno", None) in LOST_CONNECTION_ERRNOS:
+                raise
+            _write_rows(conn, cur, rows, report)
+    finally:
+        cur.close()
+
+
+def _write_rows(conn, cur, rows, report):
+    """Slow path for a chunk that failed as a whole: each row in its own transaction."""
+    for line_no, values in rows:
+        try:
+            with transaction(conn):
+                cur.execute(INSERT_SQL, values)
+                revisions.record_initial(conn, cur.lastrowid, values[2])
+            report.imported += 1
+        except Error as e:
+            errno = getattr(e, "errno", None)
+            if errno in LOST_CONNECTION_ERRNOS:
+                raise
+            message = "slug already exists" if errno == 1062 else str(e)
+            report.error(line_no, values[1], message, errno)
+
+
+def import_ndjson(conn, lines):
+    """Import blogs from an iterable of NDJSON lines (bytes or str); returns an ImportReport."""
+    report = ImportReport()
+    chunk = []
+    try:
+        for raw in lines:
+            report.lines += 1
+            if isinstance(raw, bytes):
+                try:
+                    raw = raw.decode("utf-8")
+                except UnicodeDecodeError:
+                    report.error(report.lines, None, "line is not valid UTF-8")
+                    continue
+            if not raw.strip():
+                continue
+            parsed = _parse(report.lines, raw, report)
+            if parsed is None:
+                continue
+            chunk.append(parsed)
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                _write_chunk(conn, chunk, report)
+                chunk = []
+        if chunk:
+            _write_chunk(conn, chunk, report)
+    except Error as e:
+        report.aborted = e
+    return report
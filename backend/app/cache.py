@@ -0,0 +1,301 @@
+# app/cache.py
+"""
+Query result cache, tagged by table and row.
+
+Reads are cached under (SQL, params, versions of their tags). Tags name what a
+result depends on: "courses" for a list of courses, "courses:7" for course 7.
+Write handlers call invalidate(table, row_id) once the change is committed,
+which bumps the version of "courses" and "courses:7"; every cached result that
+depends on either is then simply never looked up again and ages out of the LRU.
+Because tag versions are read *before* the query runs, a result loaded while a
+write is in progress is filed under the old version and can't be served later.
+
+Backends:
+  memory (default)  per-process LRU bounded to RESULT_CACHE_SIZE entries (a count,
+                    not bytes: a search page holds up to 51 full blog contents). A worker
+                    only sees its own invalidations, so with several workers (gunicorn
+                    -w N) another worker can serve an edited or deleted row until the
+                    entry expires: entries live RESULT_CACHE_LOCAL_TTL seconds (default
+                    2), which bounds that window while still absorbing bursts.
+  redis             shared between workers/hosts; set RESULT_CACHE_URL=redis://...
+                    (needs the `redis` package). Invalidations are seen everywhere at
+                    once, so entries can live RESULT_CACHE_TTL seconds (a backstop).
+                    Use this for multi-worker deployments.
+
+KeyToId (blog_slugs) is a separate per-process map from a natural key to a row
+id, so lookups by slug can be answered from the per-row cache entries.
+"""
+import hashlib
+import os
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+# set RESULT_CACHE=0 to always go to MySQL
+ENABLED = os.getenv("RESULT_CACHE", "1") != "0"
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "300"))
+RESULT_CACHE_URL = os.getenv("RESULT_CACHE_URL", "")
+# entry lifetime for the per-process backend (other workers' edits show up after at most this)
+RESULT_CACHE_LOCAL_TTL = float(os.getenv("RESULT_CACHE_LOCAL_TTL", "2"))
+# blog slug -> id entries kept for GET /blog/<slug>
+SLUG_CACHE_SIZE = int(os.getenv("SLUG_CACHE_SIZE", "4096"))
+
+_MISS = object()
+
+
+class MemoryBackend:
+    """
+    Thread-safe LRU of entries + an LRU of tag versions.
+
+    Both are bounded. Versions come from one counter, so a bump always gives a
+    tag a number it never had. A tag that isn't in the table (never seen, or
+    evicted) reads as the counter's value at the last eviction: never lower
+    than any version it had, so entries filed under a version it had before
+    its last bump can't match again.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries=1024, ttl=RESULT_CACHE_LOCAL_TTL, max_tags=None):
+        self.max_entries = max_entries
+        self.max_tags = max_tags or 8 * max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._versions = OrderedDict()  # tag -> version
+        self._clock = 0                 # last version handed out by bump()
+        self._floor = 0                 # version of tags not in _versions
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return _MISS
+            if item[0] < time.monotonic():
+                del self._entries[key]
+                return _MISS
+            self._entries.move_to_end(key)
+            return item[1]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _touch(self, tag, version):
+        self._versions[tag] = version
+        self._versions.move_to_end(tag)
+        while len(self._versions) > self.max_tags:
+            self._versions.popitem(last=False)
+            self._floor = self._clock
+
+    def versions(self, tags):
+        with self._lock:
+            result = []
+            for t in tags:
+                v = self._versions.get(t, self._floor)
+                self._touch(t, v)
+                result.append(v)
+            return result
+
+    def bump(self, tags):
+        with self._lock:
+            for t in tags:
+                self._clock += 1
+                self._touch(t, self._clock)
+
+    def size(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Shared backend: entries are pickled with a TTL, tag versions are INCR counters."""
+
+    name = "redis"
+
+    def __init__(self, url, ttl=RESULT_CACHE_TTL):
+        import redis   # optional dependency, only needed when RESULT_CACHE_URL is set
+        self._redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.evictions = 0
+
+    def get(self, key):
+        raw = self._redis.get("finwise:q:" + key)
+        return _MISS if raw is None else pickle.loads(raw)
+
+    def set(self, key, value, ttl):
+        self._redis.set("finwise:q:" + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def versions(self, tags):
+        return [int(v or 0) for v in self._redis.mget(["finwise:tag:" + t for t in tags])]
+
+    def bump(self, tags):
+        pipe = self._redis.pipeline()
+        for t in tags:
+            pipe.incr("finwise:tag:" + t)
+        pipe.execute()
+
+    def size(self):
+        return None
+
+
+class KeyToId:
+    """
+    Bounded LRU of natural key -> row id (e.g. blog slug -> blog id), with a
+    reverse index so a write that only knows the id can drop the entry.
+    Callers should still check the row they load by id still has that key:
+    another worker may have renamed it.
+    """
+
+    def __init__(self, max_entries=4096):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._ids = OrderedDict()
+        self._keys = {}
+        self._stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, key):
+        with self._lock:
+            row_id = self._ids.get(key)
+            if row_id is None:
+                self._stats["misses"] += 1
+                return None
+            self._ids.move_to_end(key)
+            self._stats["hits"] += 1
+            return row_id
+
+    def put(self, key, row_id):
+        with self._lock:
+            old = self._keys.pop(row_id, None)
+            if old is not None:
+                self._ids.pop(old, None)
+            self._ids[key] = row_id
+            self._keys[row_id] = key
+            while len(self._ids) > self.max_entries:
+                _, evicted = self._ids.popitem(last=False)
+                self._keys.pop(evicted, None)
+
+    def discard(self, key):
+        with self._lock:
+            row_id = self._ids.pop(key, None)
+            if row_id is not None:
+                self._keys.pop(row_id, None)
+
+    def forget_id(self, row_id):
+        with self._lock:
+            key = self._keys.pop(row_id, None)
+            if key is not None:
+                self._ids.pop(key, None)
+                self._stats["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._stats)
+            data["entries"] = len(self._ids)
+        return data
+
+
+_backend = None
+_backend_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = RedisBackend(RESULT_CACHE_URL) if RESULT_CACHE_URL else MemoryBackend(RESULT_CACHE_SIZE)
+    return _backend
+
+
+def set_backend(backend):
+    """Plug in another backend (anything with get/set/versions/bump/size, optionally ttl)."""
+    global _backend
+    _backend = backend
+
+
+def _ttl(backend):
+    return getattr(backend, "ttl", RESULT_CACHE_TTL)
+
+
+def _copy(value):
+    # handlers rewrite fields on the rows they get back; keep the cached copy intact
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return [dict(r) if isinstance(r, dict) else r for r in value]
+    return value
+
+
+def _key(sql, params, tags, versions):
+    raw = repr((sql, tuple(params or ()), list(zip(tags, versions))))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _lookup(sql, params, tags):
+    backend = get_backend()
+    key = _key(sql, params, tags, backend.versions(tags))
+    value = backend.get(key)
+    _count("misses" if value is _MISS else "hits")
+    return backend, key, value
+
+
+def cached(sql, params, tags, loader):
+    """Return loader()'s result for this (sql, params), from the cache when its tags haven't changed."""
+    if not ENABLED:
+        return loader()
+    backend, key, value = _lookup(sql, params, tags)
+    if value is _MISS:
+        value = loader()
+        backend.set(key, _copy(value), _ttl(backend))
+    return _copy(value)
+
+
+async def cached_async(sql, params, tags, loader):
+    """cached() for the async read path; loader is a coroutine function."""
+    if not ENABLED:
+        return await loader()
+    backend, key, value = _lookup(sql, params, tags)
+    if value is _MISS:
+        value = await loader()
+        backend.set(key, _copy(value), _ttl(backend))
+    return _copy(value)
+
+
+def invalidate(table, row_id=None):
+    """Call after a committed write to `table` (and row `row_id`)."""
+    if not ENABLED:
+        return
+    tags = [table] if row_id is None else [table, "%s:%s" % (table, row_id)]
+    get_backend().bump(tags)
+    _count("invalidations")
+
+
+def stats():
+    with _stats_lock:
+        data = dict(_stats)
+    data["enabled"] = ENABLED
+    if ENABLED and _backend is not None:
+        data["backend"] = _backend.name
+        data["entries"] = _backend.size()
+        data["evictions"] = _backend.evictions
+        data["ttl"] = _ttl(_backend)
+    lookups = data["hits"] + data["misses"]
+    data["hit_ratio"] = round(data["hits"] / lookups, 4) if lookups else 0.0
+    return data
+
+
+blog_slugs = KeyToId(SLUG_CACHE_SIZE)
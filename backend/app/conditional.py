@@ -0,0 +1,56 @@
+# app/conditional.py
+"""
+Conditional GET for single-row reads (blog, course, quiz).
+
+Every row carries updated_at (bumped by the update handlers, see app/updates.py),
+which gives the validators: ETag "<table>-<id>-<updated_at in µs>" and
+Last-Modified = updated_at. A client that sends If-None-Match /
+If-Modified-Since gets 304 Not Modified and no body when nothing changed.
+
+Read routes first check the validators with a tiny primary-key lookup
+(id, updated_at) when the request is conditional, so a repeat view never has to
+load the LONGTEXT row at all:
+
+    if is_conditional():
+        version = ...SELECT id, updated_at ... WHERE id = %s
+        if version and not_modified(table, version):
+            return not_modified_response(table, version)
+    row = ...
+    return conditional_response(table, row)
+"""
+from flask import Response, jsonify, request
+from werkzeug.http import is_resource_modified
+
+
+def validators(table, row):
+    updated_at = row.get("updated_at") or row.get("created_at")
+    stamp = int(updated_at.timestamp() * 1000000) if updated_at else 0
+    return "%s-%s-%s" % (table, row["id"], stamp), updated_at
+
+
+def is_conditional():
+    return bool(request.if_none_match) or request.if_modified_since is not None
+
+
+def not_modified(table, row):
+    etag, last_modified = validators(table, row)
+    return not is_resource_modified(request.environ, etag=etag, last_modified=last_modified)
+
+
+def _with_validators(resp, table, row):
+    etag, last_modified = validators(table, row)
+    resp.set_etag(etag)
+    if last_modified:
+        resp.last_modified = last_modified
+    # clients may keep the body but must revalidate before reusing it
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
+def not_modified_response(table, row):
+    return _with_validators(Response(status=304), table, row)
+
+
+def conditional_response(table, row):
+    """200 with the row as JSON, or 304 if the client's copy is current."""
+    return _with_validators(jsonify(row), table, row).make_conditional(request)
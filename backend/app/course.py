@@ -1,7 +1,13 @@
 # app/course_routes.py
 from flask import Blueprint, request, jsonify
 from mysql.connector import Error
-from app.utils import get_db_connection   # adjust if your DB helper module name is different
+from mysql.connector.errors import PoolError
+from app.utils import DatabaseUnavailable, get_db_connection, mark_connection_lost   # adjust if your DB helper module name is different
+from app import async_db
+from app.updates import COURSE_UPDATE, NOT_FOUND, UPDATED, rating_value
+from app.cache import invalidate
+from app.conditional import conditional_response, is_conditional, not_modified, not_modified_response
+from app.streaming import RowStream, ndjson_response
 
 course_bp = Blueprint("course_bp", __name__)
 
@@ -33,11 +39,9 @@ def create_course():
     # validate rating if provided
     if rating is not None:
         try:
-            rating = float(rating)
-        except (TypeError, ValueError):
-            return jsonify({"error": "rating must be a number between 0 and 5"}), 400
-        if rating < 0 or rating > 5:
-            return jsonify({"error": "rating must be between 0 and 5"}), 400
+            rating = rating_value(rating)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
 
     conn = get_db_connection()
     try:
@@ -54,9 +58,11 @@ def create_course():
                 conn.commit()
             except Exception:
                 pass
+            invalidate("courses", course_id)   # drop cached reads of this table/row
 
             return jsonify({"message": "course created", "course_id": course_id}), 201
         except Error as e:
+            mark_connection_lost(e)
             return jsonify({"error": str(e)}), 500
         finally:
             cur.close()
@@ -69,50 +75,29 @@ def update_course(course_id):
     """
     Partial update a course. Provide any subset of fields:
     title, description, rating, thumbnail_url, video_url, content
+    Fields whose value is unchanged are not written (see app/updates.py).
     """
     data = request.get_json() or {}
-    allowed_fields = ["title", "description", "rating", "thumbnail_url", "video_url", "content"]
-    updates = []
-    params = []
-
-    # validate rating if provided
-    if "rating" in data:
-        try:
-            r = float(data.get("rating"))
-        except (TypeError, ValueError):
-            return jsonify({"error": "rating must be a number between 0 and 5"}), 400
-        if r < 0 or r > 5:
-            return jsonify({"error": "rating must be between 0 and 5"}), 400
-        # use normalized rating
-        data["rating"] = r
-
-    for f in allowed_fields:
-        if f in data:
-            updates.append(f + " = %s")
-            params.append(data.get(f))
-
-    if not updates:
-        return jsonify({"error": "no updatable fields provided"}), 400
-
-    params.append(course_id)
-    sql = f"UPDATE courses SET {', '.join(updates)} WHERE id = %s"
+    try:
+        values = COURSE_UPDATE.validate(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = get_db_connection()
     try:
-        cur = conn.cursor()
-        try:
-            cur.execute(sql, tuple(params))
-            if cur.rowcount == 0:
-                return jsonify({"error": "course not found"}), 404
+        result = COURSE_UPDATE.apply(conn, course_id, values)
+        if result == NOT_FOUND:
+            return jsonify({"error": "course not found"}), 404
+        if result == UPDATED:
             try:
                 conn.commit()
             except Exception:
                 pass
-            return jsonify({"message": "course updated", "course_id": course_id}), 200
-        except Error as e:
-            return jsonify({"error": str(e)}), 500
-        finally:
-            cur.close()
+            invalidate("courses", course_id)
+        return jsonify({"message": "course updated", "course_id": course_id, "changed": result == UPDATED}), 200
+    except Error as e:
+        mark_connection_lost(e)
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "db connection error", "details": str(e)}), 500
 
@@ -133,10 +118,63 @@ def delete_course(course_id):
                 conn.commit()
             except Exception:
                 pass
+            invalidate("courses", course_id)
             return jsonify({"message": "course deleted", "course_id": course_id}), 200
         except Error as e:
+            mark_connection_lost(e)
             return jsonify({"error": str(e)}), 500
         finally:
             cur.close()
     except Exception as e:
         return jsonify({"error": "db connection error", "details": str(e)}), 500
+
+
+@course_bp.route("/", methods=["GET"])
+async def list_courses():
+    """
+    List courses (summary fields, no content). Async read path, see app/async_db.py.
+    """
+    try:
+        rows = await async_db.run(async_db.list_courses())
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+    return jsonify({"courses": rows}), 200
+
+
+@course_bp.route("/<int:course_id>", methods=["GET"])
+async def get_course(course_id):
+    """
+    Fetch a course by id (async read path). Conditional GET as for blogs.
+    """
+    try:
+        if is_conditional():
+            version = await async_db.run(async_db.get_version("courses", course_id))
+            if version and not_modified("courses", version):
+                return not_modified_response("courses", version)
+        row = await async_db.run(async_db.get_course(course_id))
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+    if not row:
+        return jsonify({"error": "course not found"}), 404
+    return conditional_response("courses", row)
+
+
+@course_bp.route("/export", methods=["GET"])
+def export_courses():
+    """
+    Export every course, content included, as NDJSON (one course per line).
+    Rows are streamed from an unbuffered cursor, see app/streaming.py.
+    """
+    rows = RowStream(
+        "SELECT id, title, description, rating, thumbnail_url, video_url, content, created_at "
+        "FROM courses ORDER BY id"
+    )
+    return ndjson_response(rows)
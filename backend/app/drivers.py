@@ -0,0 +1,193 @@
+# app/drivers.py
+"""
+Thin driver layer under the connection pool.
+
+DB_DRIVER picks the MySQL client library:
+  connector-c   mysql-connector-python with its C extension (connection_cext); falls
+                back to pure Python when the extension isn't installed (default, and
+                what a bare mysql.connector.connect() does)
+  connector     mysql-connector-python forced to the pure Python protocol
+  pymysql       PyMySQL
+  mysqlclient   MySQLdb (mysqlclient)
+  oracle        oracledb session pool against Oracle XE (see app/oracle.py)
+
+Handlers are written against the mysql.connector API (cursor(dictionary=True),
+start_transaction(), is_connected(), mysql.connector.Error with .errno), so the
+PyMySQL / MySQLdb connections are wrapped in adapters that expose that surface,
+return rows in the same dict shape and re-raise driver errors as the matching
+mysql.connector exceptions (so e.g. errno 1062 handling keeps working).
+"""
+import os
+
+import mysql.connector
+from mysql.connector import errors
+
+DRIVERS = ("connector-c", "connector", "pymysql", "mysqlclient", "oracle")
+DB_DRIVER = os.getenv("DB_DRIVER", "connector-c")
+
+if DB_DRIVER == "connector-c" and not mysql.connector.HAVE_CEXT:
+    print("DB_DRIVER=connector-c: C extension not available, using the pure Python protocol")
+
+
+def _translate(e):
+    # driver exceptions carry (errno, message) in args; the DB-API class names
+    # (IntegrityError, OperationalError, ...) match mysql.connector's
+    errno = e.args[0] if e.args and isinstance(e.args[0], int) else None
+    msg = e.args[1] if len(e.args) > 1 else str(e)
+    cls = getattr(errors, type(e).__name__, None)
+    if isinstance(cls, type) and issubclass(cls, errors.Error):
+        return cls(msg=msg, errno=errno)
+    if errno is None:
+        return errors.InterfaceError(msg=str(e))
+    return errors.get_mysql_exception(errno, msg=msg)
+
+
+class DBAPICursor:
+    """Wraps a PyMySQL / MySQLdb cursor; driver errors become mysql.connector errors."""
+
+    def __init__(self, cursor, driver_error):
+        self._cursor = cursor
+        self._driver_error = driver_error
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _call(self, fn, *args):
+        try:
+            return fn(*args)
+        except self._driver_error as e:
+            raise _translate(e) from e
+
+    def execute(self, operation, params=None):
+        return self._call(self._cursor.execute, operation, params)
+
+    def executemany(self, operation, seq_params):
+        return self._call(self._cursor.executemany, operation, list(seq_params))
+
+    def fetchone(self):
+        return self._call(self._cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return list(self._call(self._cursor.fetchmany, size or self._cursor.arraysize))
+
+    def fetchall(self):
+        return list(self._call(self._cursor.fetchall))
+
+    @property
+    def with_rows(self):
+        return self._cursor.description is not None
+
+    def close(self):
+        try:
+            self._cursor.close()
+        except self._driver_error:
+            pass
+
+
+class DBAPIConnection:
+    """mysql.connector-style facade over a PyMySQL or MySQLdb connection."""
+
+    def __init__(self, conn, module, cursor_classes):
+        self._conn = conn
+        self._module = module
+        # (buffered tuple, buffered dict, unbuffered tuple, unbuffered dict)
+        self._cursor_classes = cursor_classes
+        self.in_transaction = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, dictionary=False, buffered=True, prepared=False, **kwargs):
+        # prepared=True is accepted for API compatibility; these drivers only use
+        # client-side parameter interpolation
+        cls = self._cursor_classes[(0 if buffered else 2) + (1 if dictionary else 0)]
+        return DBAPICursor(self._conn.cursor(cls), self._module.Error)
+
+    def is_connected(self):
+        try:
+            if self._module.__name__ == "pymysql":
+                self._conn.ping(reconnect=False)
+            else:
+                self._conn.ping()
+            return True
+        except self._module.Error:
+            return False
+
+    def start_transaction(self):
+        try:
+            self._conn.begin()
+        except self._module.Error as e:
+            raise _translate(e) from e
+        self.in_transaction = True
+
+    def commit(self):
+        try:
+            self._conn.commit()
+        except self._module.Error as e:
+            raise _translate(e) from e
+        finally:
+            self.in_transaction = False
+
+    def rollback(self):
+        try:
+            self._conn.rollback()
+        except self._module.Error as e:
+            raise _translate(e) from e
+        finally:
+            self.in_transaction = False
+
+    def close(self):
+        try:
+            self._conn.close()
+        except self._module.Error:
+            pass
+
+
+def _dbapi_config(config):
+    config = dict(config)
+    if "connection_timeout" in config:
+        config["connect_timeout"] = config.pop("connection_timeout")
+    return config
+
+
+def _connect_pymysql(config):
+    import pymysql
+    import pymysql.cursors
+    try:
+        conn = pymysql.connect(charset="utf8mb4", **_dbapi_config(config))
+    except pymysql.Error as e:
+        raise _translate(e) from e
+    c = pymysql.cursors
+    return DBAPIConnection(conn, pymysql, (c.Cursor, c.DictCursor, c.SSCursor, c.SSDictCursor))
+
+
+def _connect_mysqlclient(config):
+    import MySQLdb
+    import MySQLdb.cursors
+    try:
+        conn = MySQLdb.connect(charset="utf8mb4", **_dbapi_config(config))
+    except MySQLdb.Error as e:
+        raise _translate(e) from e
+    c = MySQLdb.cursors
+    return DBAPIConnection(conn, MySQLdb, (c.Cursor, c.DictCursor, c.SSCursor, c.SSDictCursor))
+
+
+def connect(config, driver=None):
+    """Open a connection with the configured driver (see module docstring)."""
+    driver = driver or DB_DRIVER
+    if driver == "connector":
+        return mysql.connector.connect(use_pure=True, **config)
+    if driver == "connector-c":
+        # use_pure=False raises ImportError when the C extension isn't installed
+        return mysql.connector.connect(use_pure=not mysql.connector.HAVE_CEXT, **config)
+    if driver == "pymysql":
+        return _connect_pymysql(config)
+    if driver == "mysqlclient":
+        return _connect_mysqlclient(config)
+    if driver == "oracle":
+        from app import oracle
+        return oracle.connect(config)
+    raise ValueError("unknown DB_DRIVER %r (expected one of %s)" % (driver, ", ".join(DRIVERS)))
@@ -2,7 +2,8 @@
 import hashlib
 from flask import Blueprint, request, jsonify, session
 from mysql.connector import Error
-from app.utils import get_db_connection   # adjust path if different
+from app.utils import get_read_connection, mark_connection_lost   # adjust path if different
+from app.statements import fetch_one
 
 auth_bp = Blueprint("auth_bp", __name__)
 
@@ -23,15 +24,13 @@ def employee_login():
     if not email or not password:
         return jsonify({"error": "email and password required"}), 400
     print(email, password)
-    conn = get_db_connection()
+    conn = get_read_connection()   # replica unless this session just wrote
     try:
-        cur = conn.cursor(dictionary=True)
         try:
-            cur.execute("SELECT id, password, name, role FROM employees WHERE email = %s", (email,))
-            row = cur.fetchone()
-            cur.close()
+            # registered lookup (prepared per pooled connection with PREPARED_STATEMENTS=1, see app/statements.py)
+            row = fetch_one(conn, "employee_by_email", (email,))
         except Exception as e:
-            cur.close()
+            mark_connection_lost(e)
             return jsonify({"error": "db query failed", "details": str(e)}), 500
 
         if not row:
@@ -80,15 +79,12 @@ def employee_me():
     if not emp_id:
         return jsonify({"employee": None}), 200
 
-    conn = get_db_connection()
+    conn = get_read_connection()   # replica unless this session just wrote
     try:
-        cur = conn.cursor(dictionary=True)
         try:
-            cur.execute("SELECT id, email, name, role, phone, created_at FROM employees WHERE id = %s", (emp_id,))
-            row = cur.fetchone()
-            cur.close()
+            row = fetch_one(conn, "employee_by_id", (emp_id,))
         except Exception as e:
-            cur.close()
+            mark_connection_lost(e)
             return jsonify({"error": "db query failed", "details": str(e)}), 500
 
         if not row:
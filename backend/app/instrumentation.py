@@ -0,0 +1,232 @@
+# app/instrumentation.py
+"""
+Per-statement timing for everything that goes through the pooled connections.
+
+The pool wraps each connection so its cursors report, for every statement:
+execution + fetch time, rows returned/affected and the Flask endpoint that ran it.
+Results are aggregated per statement and per route into latency histograms
+(GET /health/queries), and statements slower than SLOW_QUERY_MS are written to
+the slow-query log with their parameter values redacted.
+"""
+import logging
+import os
+import re
+import threading
+import time
+
+from flask import has_request_context, request
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# file path for the slow-query log; empty = log to stderr
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "")
+
+# histogram bucket upper bounds in ms (last bucket is everything above)
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+slow_log = logging.getLogger("finwise.slow_query")
+if not slow_log.handlers:
+    _handler = logging.FileHandler(SLOW_QUERY_LOG) if SLOW_QUERY_LOG else logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    slow_log.addHandler(_handler)
+    slow_log.setLevel(logging.WARNING)
+    slow_log.propagate = False
+
+_lock = threading.Lock()
+_by_statement = {}
+_by_route = {}
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    if isinstance(sql, (bytes, bytearray)):
+        sql = sql.decode("utf-8", "replace")
+    return _WS.sub(" ", sql).strip()
+
+
+def redact(params):
+    # keep only the shape of the parameters, never the values (emails, passwords, content...)
+    if params is None:
+        return "[]"
+    if isinstance(params, dict):
+        return "{" + ", ".join("%s: <%s>" % (k, type(v).__name__) for k, v in params.items()) + "}"
+    return "[" + ", ".join("<%s>" % type(v).__name__ for v in params) + "]"
+
+
+def current_route():
+    if has_request_context():
+        return request.endpoint or request.path
+    return "-"
+
+
+def _new_bucket():
+    return {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "histogram": [0] * (len(BUCKETS_MS) + 1)}
+
+
+def _add(agg, ms, rows, error):
+    agg["count"] += 1
+    agg["total_ms"] += ms
+    agg["max_ms"] = max(agg["max_ms"], ms)
+    agg["rows"] += max(rows, 0)
+    if error:
+        agg["errors"] += 1
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            agg["histogram"][i] += 1
+            break
+    else:
+        agg["histogram"][-1] += 1
+
+
+def record(sql, params, seconds, rows, route=None, error=False):
+    """Record one executed statement (also used directly by the async path)."""
+    ms = seconds * 1000.0
+    sql = normalize_sql(sql)
+    route = route or current_route()
+    with _lock:
+        _add(_by_statement.setdefault(sql, _new_bucket()), ms, rows, error)
+        _add(_by_route.setdefault(route, _new_bucket()), ms, rows, error)
+    if ms >= SLOW_QUERY_MS:
+        slow_log.warning("slow query %.1fms route=%s rows=%s params=%s sql=%s", ms, route, rows, redact(params), sql)
+
+
+def _summary(agg):
+    data = dict(agg)
+    data["total_ms"] = round(data["total_ms"], 3)
+    data["max_ms"] = round(data["max_ms"], 3)
+    data["mean_ms"] = round(agg["total_ms"] / agg["count"], 3) if agg["count"] else 0.0
+    # list of [bucket, count] pairs so the buckets keep their order in JSON
+    data["histogram"] = [list(p) for p in zip(["<=%sms" % b for b in BUCKETS_MS] + [">%sms" % BUCKETS_MS[-1]], agg["histogram"])]
+    return data
+
+
+def query_stats():
+    with _lock:
+        statements = {sql: _summary(a) for sql, a in _by_statement.items()}
+        routes = {route: _summary(a) for route, a in _by_route.items()}
+    return {"slow_query_ms": SLOW_QUERY_MS, "statements": statements, "routes": routes}
+
+
+def reset_stats():
+    with _lock:
+        _by_statement.clear()
+        _by_route.clear()
+
+
+class InstrumentedCursor:
+    """
+    Cursor proxy: times execute() plus any fetches of its result and records the
+    statement once the result has been consumed (or the cursor moves on / closes).
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._pending = None    # [sql, params, seconds, rows_fetched, route]
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    def _flush(self, error=False):
+        pending, self._pending = self._pending, None
+        if pending is None:
+            return
+        sql, params, seconds, fetched, route = pending
+        rows = fetched if fetched else self._cursor.rowcount
+        record(sql, params, seconds, rows if rows is not None else 0, route, error)
+
+    def _timed(self, sql, params, fn):
+        self._flush()
+        route = current_route()
+        start = time.perf_counter()
+        try:
+            result = fn()
+        except Exception:
+            self._pending = [sql, params, time.perf_counter() - start, 0, route]
+            self._flush(error=True)
+            raise
+        self._pending = [sql, params, time.perf_counter() - start, 0, route]
+        if not getattr(self._cursor, "with_rows", False):
+            # INSERT/UPDATE/DELETE: nothing to fetch, rowcount is final
+            self._flush()
+        return result
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._timed(operation, params, lambda: self._cursor.execute(operation, params, *args, **kwargs))
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        return self._timed(operation, seq_params[0] if seq_params else None,
+                           lambda: self._cursor.executemany(operation, seq_params, *args, **kwargs))
+
+    def _fetch(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception:
+            if self._pending:
+                self._flush(error=True)
+            raise
+        if self._pending:
+            self._pending[2] += time.perf_counter() - start
+        return result
+
+    def fetchone(self):
+        row = self._fetch(self._cursor.fetchone)
+        if self._pending:
+            if row is None:
+                self._flush()
+            else:
+                self._pending[3] += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._fetch(self._cursor.fetchmany, size) if size is not None else self._fetch(self._cursor.fetchmany)
+        if self._pending:
+            self._pending[3] += len(rows)
+            if not rows:
+                self._flush()
+        return rows
+
+    def fetchall(self):
+        rows = self._fetch(self._cursor.fetchall)
+        if self._pending:
+            self._pending[3] += len(rows)
+            self._flush()
+        return rows
+
+    def close(self):
+        self._flush()
+        return self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors are InstrumentedCursor; everything else is delegated."""
+
+    def __init__(self, conn):
+        self.__dict__["_conn"] = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        # private attributes (e.g. the prepared statement cache) live on the proxy;
+        # public ones such as autocommit go through to the real connection
+        if name.startswith("_"):
+            self.__dict__[name] = value
+        else:
+            setattr(self._conn, name, value)
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs))
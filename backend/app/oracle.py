@@ -0,0 +1,253 @@
+# app/oracle.py
+"""
+Oracle backend (DB_DRIVER=oracle) for the compose stack's Oracle XE.
+
+Connections come from a per-process oracledb session pool (created lazily, with
+a statement cache on every session), and are wrapped so handlers keep using the
+same mysql.connector-style API as on MySQL:
+  * %s / %(name)s placeholders are rewritten to :1 / :name binds (cached per SQL)
+  * a trailing `LIMIT n` / `LIMIT offset, n` becomes FETCH FIRST / OFFSET ... FETCH NEXT
+  * rows come back as dicts keyed by lower-case column name, CLOBs as str
+  * INSERTs get `RETURNING id INTO ...` so cursor.lastrowid is the new id (except
+    into tables keyed on something else, see NO_ID_TABLES)
+  * executemany() uses oracledb array binding (one round trip per batch)
+  * ORA errors are re-raised as mysql.connector errors (ORA-00001 -> errno 1062)
+Schema: db/oracle_schema.sql.
+"""
+import os
+import re
+import threading
+
+from mysql.connector import errors
+
+ORACLE_CONFIG = {
+    "user": os.getenv("DB_USER", "fl_user"),
+    "password": os.getenv("DB_PASSWORD", "fl_pass"),
+    "dsn": "%s:%s/%s" % (
+        os.getenv("DB_HOST", "oracle_db"),
+        os.getenv("DB_PORT", "1521"),
+        os.getenv("DB_SERVICE", "XE"),
+    ),
+}
+ORACLE_STMT_CACHE = int(os.getenv("ORACLE_STMT_CACHE", "40"))
+# session pool sizing; defaults follow the app's DB_POOL_* settings
+ORACLE_POOL_MIN = int(os.getenv("ORACLE_POOL_MIN", os.getenv("DB_POOL_MIN_SIZE", "1")))
+ORACLE_POOL_MAX = int(os.getenv("ORACLE_POOL_MAX", os.getenv("DB_POOL_MAX_SIZE", "10")))
+ORACLE_POOL_TIMEOUT = float(os.getenv("ORACLE_POOL_TIMEOUT", os.getenv("DB_POOL_TIMEOUT", "5")))
+
+# Oracle error codes -> the MySQL errno the handlers already understand
+_ERRNO_MAP = {
+    1: 1062,        # ORA-00001 unique constraint violated -> ER_DUP_ENTRY
+    2291: 1452,     # ORA-02291 parent key not found -> ER_NO_REFERENCED_ROW_2
+    3113: 2013,     # ORA-03113 end-of-file on communication channel -> CR_SERVER_LOST
+    3114: 2006,     # ORA-03114 not connected -> CR_SERVER_GONE_ERROR
+}
+# column names that are reserved words in Oracle (quoted in oracle_schema.sql)
+_RESERVED = {"comment": '"COMMENT"'}
+
+_PARAM = re.compile(r"%\((\w+)\)s|%s")
+_RESERVED_RE = re.compile(r"\b(%s)\b" % "|".join(_RESERVED), re.IGNORECASE)
+_INSERT = re.compile(r"^\s*INSERT\s+INTO\s+(\w+)", re.IGNORECASE)
+# tables without an `id` column: no RETURNING clause (there is no new id to report)
+NO_ID_TABLES = {"blog_views", "blog_signatures", "blog_related"}
+# same bind order on both sides, so params need no reordering
+_LIMIT_OFFSET = re.compile(r"\bLIMIT\s+(%s|\d+)\s*,\s*(%s|\d+)\s*$", re.IGNORECASE)
+_LIMIT = re.compile(r"\bLIMIT\s+(%s|\d+)\s*$", re.IGNORECASE)
+
+_sql_cache = {}
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+# pools inherited across fork are kept referenced, never closed (see app/utils.py)
+_inherited_pools = []
+
+
+def translate_sql(sql):
+    """MySQL-style SQL text -> Oracle SQL text (placeholders, reserved column names, LIMIT)."""
+    cached = _sql_cache.get(sql)
+    if cached is not None:
+        return cached
+    out = sql.strip().rstrip(";")
+    out = _LIMIT_OFFSET.sub(r"OFFSET \1 ROWS FETCH NEXT \2 ROWS ONLY", out)
+    out = _LIMIT.sub(r"FETCH FIRST \1 ROWS ONLY", out)
+    counter = iter(range(1, 10000))
+    out = _PARAM.sub(lambda m: ":" + (m.group(1) or str(next(counter))), out)
+    out = _RESERVED_RE.sub(lambda m: _RESERVED[m.group(1).lower()], out)
+    out = out.strip().rstrip(";")
+    _sql_cache[sql] = out
+    return out
+
+
+def _translate_error(e):
+    err = e.args[0] if e.args else None
+    code = getattr(err, "code", 0) or 0
+    msg = getattr(err, "message", None) or str(e)
+    errno = _ERRNO_MAP.get(code, code)
+    if errno == 1062:
+        return errors.IntegrityError(msg=msg, errno=errno)
+    if errno in (2006, 2013):
+        return errors.OperationalError(msg=msg, errno=errno)
+    return errors.DatabaseError(msg=msg, errno=errno)
+
+
+def _get_pool():
+    global _pool, _pool_pid
+    import oracledb
+
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                if _pool is not None:
+                    _inherited_pools.append(_pool)
+                # LONGTEXT-style columns are CLOBs here; fetch them as plain str
+                oracledb.defaults.fetch_lobs = False
+                _pool = oracledb.create_pool(
+                    min=ORACLE_POOL_MIN,
+                    max=ORACLE_POOL_MAX,
+                    increment=1,
+                    getmode=oracledb.POOL_GETMODE_TIMEDWAIT,
+                    wait_timeout=int(ORACLE_POOL_TIMEOUT * 1000),
+                    stmtcachesize=ORACLE_STMT_CACHE,
+                    **ORACLE_CONFIG
+                )
+                _pool_pid = pid
+    return _pool
+
+
+def pool_stats():
+    if _pool is None:
+        return {}
+    return {"opened": _pool.opened, "busy": _pool.busy, "max": _pool.max, "stmtcachesize": _pool.stmtcachesize}
+
+
+class OracleCursor:
+    def __init__(self, conn, dictionary=False):
+        self._conn = conn
+        self._cursor = conn._conn.cursor()
+        self._dictionary = dictionary
+        self.lastrowid = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _set_rowfactory(self):
+        if self._dictionary and self._cursor.description:
+            names = [d[0].lower() for d in self._cursor.description]
+            self._cursor.rowfactory = lambda *row: dict(zip(names, row))
+
+    def execute(self, operation, params=None):
+        sql = translate_sql(operation)
+        params = params if params is not None else ()
+        returning = None
+        insert = _INSERT.match(sql)
+        if (insert and insert.group(1).lower() not in NO_ID_TABLES
+                and "RETURNING" not in sql.upper() and not isinstance(params, dict)):
+            returning = self._cursor.var(int)
+            sql = sql + " RETURNING id INTO :%d" % (len(params) + 1)
+            params = list(params) + [returning]
+        try:
+            self._cursor.execute(sql, params)
+        except Exception as e:
+            raise _translate_error(e) from e
+        if returning is not None:
+            value = returning.getvalue()
+            self.lastrowid = value[0] if isinstance(value, list) and value else value
+        self._set_rowfactory()
+
+    def executemany(self, operation, seq_params, batcherrors=False):
+        """Array DML: all rows are bound and sent in one round trip."""
+        sql = translate_sql(operation)
+        try:
+            self._cursor.executemany(sql, list(seq_params), batcherrors=batcherrors)
+        except Exception as e:
+            raise _translate_error(e) from e
+
+    def getbatcherrors(self):
+        """[(row offset, mysql-style errno, message)] from executemany(batcherrors=True)."""
+        return [(err.offset, _ERRNO_MAP.get(err.code, err.code), err.message) for err in self._cursor.getbatcherrors()]
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size=None):
+        return self._cursor.fetchmany(size) if size else self._cursor.fetchmany()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def with_rows(self):
+        return self._cursor.description is not None
+
+    def close(self):
+        try:
+            self._cursor.close()
+        except Exception:
+            pass
+
+
+class OracleConnection:
+    """mysql.connector-style facade over a pooled oracledb connection."""
+
+    def __init__(self, conn, autocommit=True):
+        self._conn = conn
+        self._autocommit = autocommit
+        # mirror MySQL autocommit; oracledb piggybacks the commit on the execute round trip
+        conn.autocommit = autocommit
+        self.in_transaction = False
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, dictionary=False, prepared=False, **kwargs):
+        # prepared is implicit: the session statement cache reuses parsed cursors
+        return OracleCursor(self, dictionary=dictionary)
+
+    def is_connected(self):
+        try:
+            self._conn.ping()
+            return True
+        except Exception:
+            return False
+
+    def start_transaction(self):
+        self._conn.autocommit = False
+        self.in_transaction = True
+
+    def _end_transaction(self, fn):
+        try:
+            fn()
+        except Exception as e:
+            raise _translate_error(e) from e
+        finally:
+            self._conn.autocommit = self._autocommit
+            self.in_transaction = False
+
+    def commit(self):
+        self._end_transaction(self._conn.commit)
+
+    def rollback(self):
+        self._end_transaction(self._conn.rollback)
+
+    def close(self):
+        # returns the session to the oracledb pool
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+
+
+def connect(config):
+    """Acquire a session from the process's oracledb pool (only config["autocommit"] is used)."""
+    import oracledb
+
+    pool = _get_pool()
+    try:
+        conn = pool.acquire()
+    except oracledb.Error as e:
+        raise _translate_error(e) from e
+    return OracleConnection(conn, autocommit=config.get("autocommit", True))
@@ -0,0 +1,42 @@
+# app/pagination.py
+"""
+Opaque cursors for keyset pagination.
+
+A cursor is the sort key of the last row on a page, e.g. (created_at, id),
+packed as url-safe base64 JSON. Clients pass it back untouched to get the next
+page; the query then seeks straight to it through the index instead of
+counting past OFFSET rows, so deep pages cost the same as the first one.
+"""
+import base64
+import json
+from datetime import datetime
+
+
+def encode_cursor(*values):
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, count):
+    """Cursor string -> list of `count` values; raises ValueError if it isn't one of ours."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+    except Exception:
+        raise ValueError("invalid cursor")
+    if not isinstance(values, list) or len(values) != count:
+        raise ValueError("invalid cursor")
+    return values
+
+
+def parse_limit(value, default=20, maximum=100):
+    """?limit= query argument -> int in 1..maximum; raises ValueError."""
+    if value in (None, ""):
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be at least 1")
+    return min(limit, maximum)
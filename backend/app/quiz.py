@@ -2,7 +2,13 @@
 import json
 from flask import Blueprint, request, jsonify
 from mysql.connector import Error
-from app.utils import get_db_connection   # adjust import if your DB helper module name differs
+from mysql.connector.errors import PoolError
+from app.utils import DatabaseUnavailable, get_db_connection, mark_connection_lost   # adjust import if your DB helper module name differs
+from app.statements import STATEMENTS, fetch_one
+from app import async_db
+from app.updates import QUIZ_UPDATE, NOT_FOUND, UPDATED, json_value
+from app.cache import cached, invalidate
+from app.conditional import conditional_response, is_conditional, not_modified, not_modified_response
 
 quiz_bp = Blueprint("quiz_bp", __name__)
 
@@ -21,19 +27,10 @@ def create_quiz():
     data = payload.get("data")
 
     # Normalize data -> JSON string or NULL
-    data_json = None
-    if data is not None:
-        if isinstance(data, (dict, list)):
-            data_json = json.dumps(data)
-        elif isinstance(data, str):
-            # validate it's valid JSON
-            try:
-                json.loads(data)
-                data_json = data
-            except Exception:
-                return jsonify({"error": "data must be valid JSON"}), 400
-        else:
-            return jsonify({"error": "data must be an object, array or JSON string"}), 400
+    try:
+        data_json = json_value(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = get_db_connection()
     try:
@@ -46,8 +43,10 @@ def create_quiz():
                 conn.commit()
             except Exception:
                 pass
+            invalidate("quizzes", quiz_id)   # drop cached reads of this table/row
             return jsonify({"message": "quiz created", "quiz_id": quiz_id}), 201
         except Error as e:
+            mark_connection_lost(e)
             return jsonify({"error": str(e)}), 500
         finally:
             cur.close()
@@ -63,55 +62,29 @@ def update_quiz(quiz_id):
       "title": "...",
       "data": {...}   # or JSON string
     }
+    Fields whose value is unchanged are not written (see app/updates.py).
     """
     payload = request.get_json() or {}
-    allowed = ["title", "data"]
-    updates = []
-    params = []
-
-    if "data" in payload:
-        d = payload.get("data")
-        if d is None:
-            data_json = None
-        elif isinstance(d, (dict, list)):
-            data_json = json.dumps(d)
-        elif isinstance(d, str):
-            try:
-                json.loads(d)
-                data_json = d
-            except Exception:
-                return jsonify({"error": "data must be valid JSON"}), 400
-        else:
-            return jsonify({"error": "data must be an object, array or JSON string"}), 400
-        updates.append("data = %s")
-        params.append(data_json)
-
-    if "title" in payload:
-        updates.append("title = %s")
-        params.append(payload.get("title"))
-
-    if not updates:
-        return jsonify({"error": "no updatable fields provided"}), 400
-
-    params.append(quiz_id)
-    sql = f"UPDATE quizzes SET {', '.join(updates)} WHERE id = %s"
+    try:
+        values = QUIZ_UPDATE.validate(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
     conn = get_db_connection()
     try:
-        cur = conn.cursor()
-        try:
-            cur.execute(sql, tuple(params))
-            if cur.rowcount == 0:
-                return jsonify({"error": "quiz not found"}), 404
+        result = QUIZ_UPDATE.apply(conn, quiz_id, values)
+        if result == NOT_FOUND:
+            return jsonify({"error": "quiz not found"}), 404
+        if result == UPDATED:
             try:
                 conn.commit()
             except Exception:
                 pass
-            return jsonify({"message": "quiz updated", "quiz_id": quiz_id}), 200
-        except Error as e:
-            return jsonify({"error": str(e)}), 500
-        finally:
-            cur.close()
+            invalidate("quizzes", quiz_id)
+        return jsonify({"message": "quiz updated", "quiz_id": quiz_id, "changed": result == UPDATED}), 200
+    except Error as e:
+        mark_connection_lost(e)
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "db connection error", "details": str(e)}), 500
 
@@ -129,8 +102,10 @@ def delete_quiz(quiz_id):
                 conn.commit()
             except Exception:
                 pass
+            invalidate("quizzes", quiz_id)
             return jsonify({"message": "quiz deleted", "quiz_id": quiz_id}), 200
         except Error as e:
+            mark_connection_lost(e)
             return jsonify({"error": str(e)}), 500
         finally:
             cur.close()
@@ -142,26 +117,48 @@ def delete_quiz(quiz_id):
 def get_quiz(quiz_id):
     """
     Optional helper: fetch quiz and parse JSON 'data' column into a JSON object if possible.
+    Conditional GET: 304 for an unchanged quiz without loading its data.
     """
-    conn = get_db_connection()
     try:
-        cur = conn.cursor(dictionary=True)
-        try:
-            cur.execute("SELECT id, title, data, created_at FROM quizzes WHERE id = %s", (quiz_id,))
-            row = cur.fetchone()
-            if not row:
-                return jsonify({"error": "quiz not found"}), 404
-            # parse JSON field if present
-            if row.get("data"):
-                try:
-                    row["data"] = json.loads(row["data"])
-                except Exception:
-                    # leave as raw string if invalid
-                    pass
-            return jsonify(row), 200
-        except Error as e:
-            return jsonify({"error": str(e)}), 500
-        finally:
-            cur.close()
+        if is_conditional():
+            version = cached(STATEMENTS["quiz_version"], (quiz_id,), ["quizzes:%s" % quiz_id],
+                             lambda: fetch_one(get_db_connection(), "quiz_version", (quiz_id,)))
+            if version and not_modified("quizzes", version):
+                return not_modified_response("quizzes", version)
+        # cached until the quiz is written (see app/cache.py); misses read the primary
+        # so a lagging replica can't put an old version of the row in the cache
+        row = cached(STATEMENTS["quiz_by_id"], (quiz_id,), ["quizzes:%s" % quiz_id],
+                     lambda: fetch_one(get_db_connection(), "quiz_by_id", (quiz_id,)))
+        if not row:
+            return jsonify({"error": "quiz not found"}), 404
+        # parse JSON field if present
+        if row.get("data"):
+            try:
+                row["data"] = json.loads(row["data"])
+            except Exception:
+                # leave as raw string if invalid
+                pass
+        return conditional_response("quizzes", row)
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        mark_connection_lost(e)
+        return jsonify({"error": str(e)}), 500
+    except Exception as e:
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
+
+
+@quiz_bp.route("/", methods=["GET"])
+async def list_quizzes():
+    """
+    List quizzes (id, title, created_at) without the JSON payload. Async read path.
+    """
+    try:
+        rows = await async_db.run(async_db.list_quizzes())
+    except (PoolError, DatabaseUnavailable):
+        raise   # answered with 503 by the app's error handlers
+    except Error as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "db connection error", "details": str(e)}), 500
+    return jsonify({"quizzes": rows}), 200
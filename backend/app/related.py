@@ -0,0 +1,300 @@
+# app/related.py
+"""
+Related posts, precomputed.
+
+Each blog gets a MinHash signature of its vocabulary (the set of non-stopword
+terms in title + content): RELATED_HASHES seeded hash functions, keeping the low
+byte of each minimum ("b-bit MinHash"). Two signatures agree in a position with
+probability ~ the Jaccard similarity of the two vocabularies, and comparing two
+of them is one XOR plus a byte count, so scanning every signature is cheap.
+
+Tables:
+  blog_signatures  blog_id -> signature
+  blog_related     (blog_id, related_id, score): the RELATED_COUNT most similar
+                   blogs per blog, so GET /blog/<id>/related is one primary-key
+                   range read joined to blogs
+
+schedule(blog_id) is called by create_blog / update_blog (title or content
+changed); a background thread then refreshes that blog: new signature, its own
+neighbour list, and its entry in every other blog's list it now qualifies for
+(or no longer does). A blog that drops out of another's list leaves that list
+one short until the next full rebuild: `python -m app.related`, which
+recomputes every signature and list (run it once after adding the tables, and
+from cron if lists drifting short matters).
+"""
+import hashlib
+import heapq
+import os
+import random
+import re
+import threading
+import time
+
+from app.cache import invalidate
+from app.render import plain_text
+from app.utils import init_db_connection, transaction
+
+RELATED_COUNT = int(os.getenv("RELATED_COUNT", "6"))
+RELATED_MIN_SCORE = float(os.getenv("RELATED_MIN_SCORE", "0.05"))
+RELATED_HASHES = 128
+
+_PRIME = (1 << 61) - 1
+# fixed seed: every process must produce the same signature for the same text
+_rng = random.Random(20240501)
+_COEFFS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(RELATED_HASHES)]
+
+_TERM = re.compile(r"[^\W\d_]{3,}", re.UNICODE)
+STOPWORDS = frozenset("""
+about above after again against all also and any are because been before being below between both but
+can could did does doing down during each few for from further had has have having her here hers herself
+him himself his how into its itself just more most not now off once only other our ours ourselves out over
+own same she should some such than that the their theirs them themselves then there these they this those
+through too under until very was were what when where which while who whom why will with would you your
+yours yourself yourselves get got like make many much one two use used using way well
+""".split())
+
+
+# ---- signatures ----
+
+def terms(title, content):
+    text = plain_text((title or "") + "\n" + (content or "")).lower()
+    return {t for t in _TERM.findall(text) if t not in STOPWORDS}
+
+
+def signature(title, content):
+    """RELATED_HASHES bytes, or None for a blog with no usable terms."""
+    words = terms(title, content)
+    if not words:
+        return None
+    hashed = [int.from_bytes(hashlib.blake2b(w.encode("utf-8"), digest_size=8).digest(), "big") for w in words]
+    return bytes(min((a * h + b) % _PRIME for h in hashed) & 0xFF for a, b in _COEFFS)
+
+
+def _as_int(sig):
+    return int.from_bytes(bytes(sig), "big")
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures (as ints from _as_int)."""
+    same = (a ^ b).to_bytes(RELATED_HASHES, "big").count(0)
+    # one-byte minima also collide by chance 1 time in 256
+    return max(0.0, (same / RELATED_HASHES - 1 / 256) / (1 - 1 / 256))
+
+
+# ---- storage ----
+
+def _load_signatures(cur, exclude=None):
+    cur.execute("SELECT blog_id, signature FROM blog_signatures")
+    return {bid: _as_int(sig) for bid, sig in cur.fetchall() if bid != exclude}
+
+
+def _store_signature(cur, blog_id, sig):
+    cur.execute("DELETE FROM blog_signatures WHERE blog_id = %s", (blog_id,))
+    if sig is not None:
+        cur.execute("INSERT INTO blog_signatures (blog_id, signature) VALUES (%s, %s)", (blog_id, sig))
+
+
+def _nearest(sig, others):
+    scored = ((similarity(sig, other), bid) for bid, other in others.items())
+    return heapq.nlargest(RELATED_COUNT, (s for s in scored if s[0] >= RELATED_MIN_SCORE))
+
+
+def refresh(conn, blog_id):
+    """Recompute one blog's signature and neighbours; returns the ids whose lists changed."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT title, content FROM blogs WHERE id = %s", (blog_id,))
+        row = cur.fetchone()
+        if row is None:
+            return set()   # deleted: its rows went with it (ON DELETE CASCADE)
+        sig = signature(row[0], row[1])
+        others = _load_signatures(cur, exclude=blog_id)
+        mine = _as_int(sig) if sig is not None else None
+        nearest = _nearest(mine, others) if mine is not None else []
+        changed = {blog_id}
+        with transaction(conn):
+            _store_signature(cur, blog_id, sig)
+            cur.execute("SELECT blog_id FROM blog_related WHERE related_id = %s", (blog_id,))
+            changed.update(r[0] for r in cur.fetchall())
+            cur.execute("DELETE FROM blog_related WHERE blog_id = %s", (blog_id,))
+            cur.execute("DELETE FROM blog_related WHERE related_id = %s", (blog_id,))
+            if nearest:
+                cur.executemany(
+                    "INSERT INTO blog_related (blog_id, related_id, score) VALUES (%s, %s, %s)",
+                    [(blog_id, bid, score) for score, bid in nearest],
+                )
+            if mine is not None:
+                changed.update(_enter_other_lists(cur, blog_id, mine, others))
+        return changed
+    finally:
+        cur.close()
+
+
+def _enter_other_lists(cur, blog_id, sig, others):
+    """Add blog_id to the lists of the blogs it is now among the nearest of."""
+    cur.execute("SELECT blog_id, COUNT(*), MIN(score) FROM blog_related GROUP BY blog_id")
+    lists = {bid: (n, low) for bid, n, low in cur.fetchall()}
+    entries, full = [], []
+    for bid, other in others.items():
+        score = similarity(sig, other)
+        if score < RELATED_MIN_SCORE:
+            continue
+        n, low = lists.get(bid, (0, None))
+        if n < RELATED_COUNT:
+            entries.append((bid, blog_id, score))
+        elif score > low:
+            entries.append((bid, blog_id, score))
+            full.append(bid)
+    if entries:
+        cur.executemany("INSERT INTO blog_related (blog_id, related_id, score) VALUES (%s, %s, %s)", entries)
+    for bid in full:
+        # push out whatever is now ranked past RELATED_COUNT
+        cur.execute(
+            "SELECT related_id FROM blog_related WHERE blog_id = %s ORDER BY score DESC, related_id",
+            (bid,),
+        )
+        extra = [r[0] for r in cur.fetchall()[RELATED_COUNT:]]
+        for related_id in extra:
+            cur.execute("DELETE FROM blog_related WHERE blog_id = %s AND related_id = %s", (bid, related_id))
+    return {e[0] for e in entries}
+
+
+def rebuild(batch_size=200):
+    """Recompute every signature and every neighbour list (offline job)."""
+    pool = init_db_connection()
+    conn = pool.get_connection()
+    sigs = {}
+    try:
+        cur = conn.cursor()
+        try:
+            last_id = 0
+            while True:
+                cur.execute("SELECT id, title, content FROM blogs WHERE id > %s ORDER BY id LIMIT %s",
+                            (last_id, batch_size))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                with transaction(conn):
+                    for blog_id, title, content in rows:
+                        sig = signature(title, content)
+                        _store_signature(cur, blog_id, sig)
+                        if sig is not None:
+                            sigs[blog_id] = _as_int(sig)
+                last_id = rows[-1][0]
+
+            # all pairs, keeping the best RELATED_COUNT per blog
+            best = {bid: [] for bid in sigs}
+            ids = sorted(sigs)
+            for i, a in enumerate(ids):
+                sa = sigs[a]
+                for b in ids[i + 1:]:
+                    score = similarity(sa, sigs[b])
+                    if score < RELATED_MIN_SCORE:
+                        continue
+                    for x, y in ((a, b), (b, a)):
+                        heap = best[x]
+                        if len(heap) < RELATED_COUNT:
+                            heapq.heappush(heap, (score, y))
+                        elif score > heap[0][0]:
+                            heapq.heapreplace(heap, (score, y))
+
+            with transaction(conn):
+                cur.execute("DELETE FROM blog_related")
+                rows = [(bid, rid, score) for bid, heap in best.items() for score, rid in heap]
+                for i in range(0, len(rows), 1000):
+                    cur.executemany(
+                        "INSERT INTO blog_related (blog_id, related_id, score) VALUES (%s, %s, %s)",
+                        rows[i:i + 1000],
+                    )
+        finally:
+            cur.close()
+    finally:
+        pool.release(conn)
+    return len(sigs)
+
+
+# ---- background refresh ----
+
+_lock = threading.Lock()
+_pending = set()
+_wake = threading.Event()
+_worker = None
+_worker_pid = None
+_stats = {"scheduled": 0, "refreshed": 0, "errors": 0, "last_refresh_ms": None}
+
+
+def schedule(blog_id):
+    """Queue a refresh of blog_id's neighbours (returns immediately)."""
+    _ensure_worker()
+    with _lock:
+        _pending.add(blog_id)
+        _stats["scheduled"] += 1
+    _wake.set()
+
+
+def _ensure_worker():
+    global _worker, _worker_pid
+    pid = os.getpid()
+    if _worker is not None and _worker_pid == pid and _worker.is_alive():
+        return
+    with _lock:
+        if _worker is None or _worker_pid != pid or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, name="related-posts", daemon=True)
+            _worker_pid = pid
+            _worker.start()
+
+
+def _run():
+    while True:
+        _wake.wait()
+        _wake.clear()
+        while True:
+            with _lock:
+                if not _pending:
+                    break
+                blog_id = _pending.pop()
+            started = time.perf_counter()
+            pool = conn = None
+            discard = False
+            try:
+                pool = init_db_connection()
+                conn = pool.get_connection()
+                changed = refresh(conn, blog_id)
+            except Exception as e:
+                # anything, not just DB errors: one bad blog mustn't stop the worker
+                discard = conn is not None
+                print("Related posts refresh failed for blog", blog_id, ":", e)
+                with _lock:
+                    _stats["errors"] += 1
+                continue
+            finally:
+                if conn is not None:
+                    pool.release(conn, discard=discard)
+            for bid in changed:
+                invalidate("blog_related", bid)
+            with _lock:
+                _stats["refreshed"] += 1
+                _stats["last_refresh_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def stats():
+    with _lock:
+        data = dict(_stats)
+        data["pending"] = len(_pending)
+    data["count"] = RELATED_COUNT
+    return data
+
+
+def _reset_after_fork():
+    global _lock, _worker, _worker_pid
+    _lock = threading.Lock()
+    _pending.clear()
+    _worker = _worker_pid = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+if __name__ == "__main__":
+    print("related posts rebuilt for %d blogs" % rebuild())
@@ -0,0 +1,192 @@
+# app/render.py
+"""
+Blog fields derived from `content`, computed once when a blog is written
+(create_blog / update_blog) and stored next to it, so reads never have to
+render or scan the LONGTEXT body:
+
+  content_html   content rendered to HTML (small Markdown subset, see below)
+  excerpt        first EXCERPT_CHARS characters of the plain text, cut at a word
+  word_count     words in the plain text
+  read_minutes   word_count / WORDS_PER_MINUTE, rounded up, at least 1
+
+Markdown subset: # headings, paragraphs (blank-line separated; single newlines
+become <br>), "- " / "* " lists, "> " quotes, ``` fenced code, and inline
+**bold**, *italic*, `code` and [links](https://...). Everything else is
+escaped, so stored HTML never carries markup from the author.
+
+Run `python -m app.render` to backfill the fields for existing rows.
+"""
+import html
+import math
+import re
+
+WORDS_PER_MINUTE = 200
+EXCERPT_CHARS = 280
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*)$")
+_LIST_ITEM = re.compile(r"^[-*]\s+(.*)$")
+_CODE = re.compile(r"`([^`]+)`")
+_BOLD = re.compile(r"\*\*(.+?)\*\*")
+_ITALIC = re.compile(r"(?<!\*)\*(?!\s)(.+?)(?<!\s)\*(?!\*)")
+_LINK = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+_SAFE_URL = re.compile(r"^(https?://|mailto:|/)", re.IGNORECASE)
+_WORD = re.compile(r"\w+(?:['’]\w+)*", re.UNICODE)
+
+
+def _emphasis(text):
+    text = _BOLD.sub(r"<strong>\1</strong>", text)
+    return _ITALIC.sub(r"<em>\1</em>", text)
+
+
+def _inline(text):
+    out = html.escape(text.replace("\x00", ""), quote=False)
+    # finished markup (code spans, then whole links) is stashed behind placeholders,
+    # so later rules never see it: no <em> inside a code span or an href
+    spans = []
+
+    def stash(markup):
+        spans.append(markup)
+        return "\x00%d\x00" % (len(spans) - 1)
+
+    def link(m):
+        text, url = m.group(1), html.unescape(m.group(2))
+        if "\x00" in url:
+            return m.group(0)   # a code span inside the URL: not a link
+        if not _SAFE_URL.match(url):
+            return text
+        return stash('<a href="%s">%s</a>' % (html.escape(url), _emphasis(text)))
+
+    def restore(s):
+        return re.sub("\x00(\\d+)\x00", lambda m: restore(spans[int(m.group(1))]), s)
+
+    out = _CODE.sub(lambda m: stash("<code>%s</code>" % m.group(1)), out)
+    out = _LINK.sub(link, out)
+    return restore(_emphasis(out))
+
+
+def render_html(text):
+    if not text:
+        return ""
+    blocks = []
+    para, items, quote, code = [], [], [], None
+
+    def flush():
+        if para:
+            blocks.append("<p>%s</p>" % "<br>\n".join(_inline(l) for l in para))
+            del para[:]
+        if items:
+            blocks.append("<ul>%s</ul>" % "".join("<li>%s</li>" % _inline(i) for i in items))
+            del items[:]
+        if quote:
+            blocks.append("<blockquote><p>%s</p></blockquote>" % "<br>\n".join(_inline(l) for l in quote))
+            del quote[:]
+
+    for line in text.replace("\r\n", "\n").split("\n"):
+        if code is not None:
+            if line.strip().startswith("```"):
+                blocks.append("<pre><code>%s</code></pre>" % html.escape("\n".join(code), quote=False))
+                code = None
+            else:
+                code.append(line)
+            continue
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            flush()
+            code = []
+        elif not stripped:
+            flush()
+        elif _HEADING.match(stripped):
+            flush()
+            level, title = _HEADING.match(stripped).groups()
+            blocks.append("<h%d>%s</h%d>" % (len(level), _inline(title), len(level)))
+        elif _LIST_ITEM.match(stripped):
+            if para or quote:
+                flush()
+            items.append(_LIST_ITEM.match(stripped).group(1))
+        elif stripped.startswith(">"):
+            if para or items:
+                flush()
+            quote.append(stripped[1:].strip())
+        else:
+            if items or quote:
+                flush()
+            para.append(stripped)
+    if code is not None:
+        blocks.append("<pre><code>%s</code></pre>" % html.escape("\n".join(code), quote=False))
+    flush()
+    return "\n".join(blocks)
+
+
+def plain_text(text):
+    """Content without Markdown markers, whitespace collapsed."""
+    if not text:
+        return ""
+    out = re.sub(r"```.*?```", " ", text, flags=re.DOTALL)
+    out = _LINK.sub(r"\1", out)
+    out = re.sub(r"^\s{0,3}(#{1,6}|[-*]|>)\s+", "", out, flags=re.MULTILINE)
+    out = out.replace("**", "").replace("`", "")
+    out = re.sub(r"(?<!\w)\*(?=\S)|(?<=\S)\*(?!\w)", "", out)
+    return " ".join(out.split())
+
+
+def excerpt(plain, limit=EXCERPT_CHARS):
+    if len(plain) <= limit:
+        return plain
+    cut = plain.rfind(" ", 0, limit)
+    return plain[:cut if cut > 0 else limit].rstrip(" ,.;:") + "…"
+
+
+def blog_fields(content):
+    """The stored derived columns for a blog with this content."""
+    plain = plain_text(content)
+    words = len(_WORD.findall(plain))
+    return {
+        "content_html": render_html(content),
+        "excerpt": excerpt(plain),
+        "word_count": words,
+        "read_minutes": max(1, math.ceil(words / WORDS_PER_MINUTE)),
+    }
+
+
+def derive_blog_fields(values):
+    """PartialUpdate hook: recompute the derived columns when content is written."""
+    if "content" not in values:
+        return {}
+    return blog_fields(values["content"])
+
+
+def backfill(batch_size=200):
+    """Compute the derived columns for every blog (run once after adding them)."""
+    from app.utils import init_db_connection, transaction
+
+    pool = init_db_connection()
+    conn = pool.get_connection()
+    done = 0
+    last_id = 0
+    try:
+        cur = conn.cursor(dictionary=True)
+        try:
+            while True:
+                cur.execute("SELECT id, content FROM blogs WHERE id > %s ORDER BY id LIMIT %s", (last_id, batch_size))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+                with transaction(conn):
+                    for row in rows:
+                        f = blog_fields(row["content"])
+                        cur.execute(
+                            "UPDATE blogs SET content_html = %s, excerpt = %s, word_count = %s, read_minutes = %s "
+                            "WHERE id = %s",
+                            (f["content_html"], f["excerpt"], f["word_count"], f["read_minutes"], row["id"]),
+                        )
+                done += len(rows)
+                last_id = rows[-1]["id"]
+        finally:
+            cur.close()
+    finally:
+        pool.release(conn)
+    return done
+
+
+if __name__ == "__main__":
+    print("backfilled %d blogs" % backfill())
@@ -0,0 +1,164 @@
+# app/revisions.py
+"""
+Blog revision history, stored as compressed deltas.
+
+Every time a blog's content changes, a row is added to blog_revisions:
+  snapshot  the full content, zlib-compressed
+  delta     a line diff against the previous revision, as JSON, zlib-compressed:
+            a list of [start, end] (copy those lines of the previous revision)
+            and strings (insert this text)
+Revision 1 is always a snapshot. After that a snapshot is written every
+BLOG_SNAPSHOT_EVERY revisions (or whenever the delta wouldn't be smaller), so
+rebuilding any revision reads one snapshot plus at most BLOG_SNAPSHOT_EVERY - 1
+deltas in a single query, while storage stays close to the size of the edits.
+
+record() must run in the same transaction as the content UPDATE, after
+lock_blog() has taken the blog row lock, so revision numbers can't race.
+"""
+import difflib
+import json
+import os
+import zlib
+
+SNAPSHOT_EVERY = int(os.getenv("BLOG_SNAPSHOT_EVERY", "10"))
+
+
+def _pack(obj):
+    return zlib.compress(json.dumps(obj, separators=(",", ":")).encode("utf-8"))
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode("utf-8"))
+
+
+def make_delta(old, new):
+    """Ops turning `old` into `new`: [start, end] copies old lines, a str is inserted text."""
+    a = (old or "").splitlines(True)
+    b = (new or "").splitlines(True)
+    ops = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:   # replace / insert
+            ops.append("".join(b[j1:j2]))
+    return ops
+
+
+def apply_delta(old, ops):
+    a = (old or "").splitlines(True)
+    return "".join("".join(a[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def lock_blog(conn, blog_id):
+    """Lock the blog row for the rest of the transaction; False if it doesn't exist."""
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT id FROM blogs WHERE id = %s FOR UPDATE", (blog_id,))
+        return cur.fetchone() is not None
+    finally:
+        cur.close()
+
+
+def _insert(cur, blog_id, revision, kind, body, size):
+    cur.execute(
+        "INSERT INTO blog_revisions (blog_id, revision, kind, body, content_bytes, stored_bytes) "
+        "VALUES (%s, %s, %s, %s, %s, %s)",
+        (blog_id, revision, kind, body, size, len(body)),
+    )
+
+
+def record(conn, blog_id, old_content, new_content):
+    """Add the revision for a content change (old_content = what was stored before)."""
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            "SELECT MAX(revision) AS last, MAX(CASE WHEN kind = 'snapshot' THEN revision END) AS last_snapshot "
+            "FROM blog_revisions WHERE blog_id = %s",
+            (blog_id,),
+        )
+        row = cur.fetchone() or {}
+        last = row.get("last") or 0
+        if not last:
+            # blog predates revision history: keep what it had as revision 1
+            _insert(cur, blog_id, 1, "snapshot", _pack(old_content or ""), len((old_content or "").encode("utf-8")))
+            last, last_snapshot = 1, 1
+        else:
+            last_snapshot = row.get("last_snapshot") or 0
+        revision = last + 1
+        size = len((new_content or "").encode("utf-8"))
+        snapshot = _pack(new_content or "")
+        if revision - last_snapshot >= SNAPSHOT_EVERY:
+            _insert(cur, blog_id, revision, "snapshot", snapshot, size)
+        else:
+            delta = _pack(make_delta(old_content, new_content))
+            if len(delta) < len(snapshot):
+                _insert(cur, blog_id, revision, "delta", delta, size)
+            else:
+                _insert(cur, blog_id, revision, "snapshot", snapshot, size)
+        return revision
+    finally:
+        cur.close()
+
+
+def record_initial(conn, blog_id, content):
+    """Revision 1 for a newly created blog."""
+    cur = conn.cursor()
+    try:
+        _insert(cur, blog_id, 1, "snapshot", _pack(content or ""), len((content or "").encode("utf-8")))
+    finally:
+        cur.close()
+
+
+def record_initial_many(conn, items):
+    """Revision 1 for each (blog_id, content) of a bulk insert, in one executemany."""
+    cur = conn.cursor()
+    try:
+        rows = []
+        for blog_id, content in items:
+            body = _pack(content or "")
+            rows.append((blog_id, 1, "snapshot", body, len((content or "").encode("utf-8")), len(body)))
+        cur.executemany(
+            "INSERT INTO blog_revisions (blog_id, revision, kind, body, content_bytes, stored_bytes) "
+            "VALUES (%s, %s, %s, %s, %s, %s)",
+            rows,
+        )
+    finally:
+        cur.close()
+
+
+def list_revisions(conn, blog_id):
+    cur = conn.cursor(dictionary=True)
+    try:
+        cur.execute(
+            "SELECT revision, kind, content_bytes, stored_bytes, created_at "
+            "FROM blog_revisions WHERE blog_id = %s ORDER BY revision DESC",
+            (blog_id,),
+        )
+        return cur.fetchall()
+    finally:
+        cur.close()
+
+
+def reconstruct(conn, blog_id, revision):
+    """Content of `revision`, or None if the blog has no such revision."""
+    cur = conn.cursor(dictionary=True)
+    try:
+        # the nearest snapshot at or before the target, then the deltas up to it
+        cur.execute(
+            "SELECT revision, kind, body FROM blog_revisions "
+            "WHERE blog_id = %s AND revision <= %s AND revision >= ("
+            "  SELECT MAX(revision) FROM blog_revisions "
+            "  WHERE blog_id = %s AND revision <= %s AND kind = 'snapshot') "
+            "ORDER BY revision",
+            (blog_id, revision, blog_id, revision),
+        )
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+    if not rows or rows[-1]["revision"] != revision:
+        return None
+    content = None
+    for row in rows:
+        data = _unpack(row["body"])
+        content = data if row["kind"] == "snapshot" else apply_delta(content, data)
+    return content
@@ -0,0 +1,58 @@
+# app/search.py
+"""
+Helpers for GET /blog/search.
+
+Matching and ranking happen in MySQL through the FULLTEXT index on
+blogs(title, content) (see db/schema.sql); this module only prepares the query
+terms and cuts a highlighted snippet out of each hit's content.
+"""
+import html
+import re
+
+SNIPPET_WIDTH = 160
+# ranked results are paged with OFFSET, so cap how deep a client can go
+SEARCH_MAX_PAGE = 50
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def query_terms(q):
+    """Words of the search string, lower-cased, without duplicates."""
+    seen = []
+    for w in _WORD.findall(q.lower()):
+        if w not in seen:
+            seen.append(w)
+    return seen
+
+
+def snippet(text, terms, width=SNIPPET_WIDTH):
+    """
+    ~width characters of `text` around the first query term, HTML-escaped, with
+    every term wrapped in <mark>. Falls back to the start of the text.
+    """
+    if not text:
+        return ""
+    pattern = re.compile(r"\b(%s)\b" % "|".join(re.escape(t) for t in terms), re.IGNORECASE) if terms else None
+    m = pattern.search(text) if pattern else None
+    start = max(0, m.start() - width // 3) if m else 0
+    end = min(len(text), start + width)
+    # don't cut words in half at either end
+    if start > 0:
+        space = text.find(" ", start)
+        start = space + 1 if 0 <= space < (m.start() if m else end) else start
+    if end < len(text):
+        space = text.rfind(" ", start, end)
+        end = space if space > start else end
+    piece = " ".join(text[start:end].split())
+    if pattern:
+        # escape the text between matches, not the markup we add
+        out, pos = [], 0
+        for hit in pattern.finditer(piece):
+            out.append(html.escape(piece[pos:hit.start()]))
+            out.append("<mark>%s</mark>" % html.escape(hit.group(0)))
+            pos = hit.end()
+        out.append(html.escape(piece[pos:]))
+        piece = "".join(out)
+    else:
+        piece = html.escape(piece)
+    return ("…" if start > 0 else "") + piece + ("…" if end < len(text) else "")
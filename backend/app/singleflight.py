@@ -0,0 +1,118 @@
+# app/singleflight.py
+"""
+Single-flight coalescing for read queries.
+
+When several requests run the same read (same statement, same parameters, same
+server) at the same time, only the first one goes to MySQL; the others wait for
+its result instead of sending N identical round trips. Nothing is cached: once
+the in-flight query finishes, the next caller queries again.
+
+  do(key, fn)             threads (sync handlers, statements.fetch_one)
+  await do_async(key, fn) the async DB loop (app/async_db.py)
+
+Every caller gets its own shallow copy of the rows, so a handler that rewrites a
+field (e.g. json.loads on quiz data) doesn't change what the others see.
+Errors are shared too: if the query fails, every waiter gets the exception.
+"""
+import asyncio
+import os
+import threading
+
+# set SINGLE_FLIGHT=0 to send every read on its own
+ENABLED = os.getenv("SINGLE_FLIGHT", "1") != "0"
+
+_lock = threading.Lock()
+_calls = {}          # key -> _Call (threads)
+_async_calls = {}    # key -> asyncio.Future (only touched from the DB loop)
+_stats = {"calls": 0, "executions": 0, "coalesced": 0}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def _copy(result):
+    if isinstance(result, dict):
+        return dict(result)
+    if isinstance(result, list):
+        return [dict(r) if isinstance(r, dict) else r for r in result]
+    return result
+
+
+def _count(leader):
+    with _lock:
+        _stats["calls"] += 1
+        _stats["executions" if leader else "coalesced"] += 1
+
+
+def do(key, fn):
+    """Run fn() unless an identical call (same key) is already in flight; share its result."""
+    if not ENABLED:
+        return fn()
+    with _lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _Call()
+            _calls[key] = call
+    _count(leader)
+
+    if leader:
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with _lock:
+                _calls.pop(key, None)
+            call.done.set()
+        return _copy(call.result)
+
+    call.done.wait()
+    if call.error is not None:
+        raise call.error
+    return _copy(call.result)
+
+
+async def do_async(key, fn):
+    """Coroutine version of do(); fn is a coroutine function. Must run on the DB loop."""
+    if not ENABLED:
+        return await fn()
+    fut = _async_calls.get(key)
+    leader = fut is None
+    _count(leader)
+
+    if leader:
+        fut = asyncio.get_running_loop().create_future()
+        _async_calls[key] = fut
+        try:
+            result = await fn()
+        except BaseException as e:
+            if isinstance(e, Exception):
+                fut.set_exception(e)
+                fut.exception()    # mark retrieved even when nobody was waiting
+            else:
+                fut.cancel()
+            raise
+        else:
+            fut.set_result(result)
+        finally:
+            _async_calls.pop(key, None)
+        return _copy(result)
+
+    # shield: one waiter timing out must not cancel the shared query
+    return _copy(await asyncio.shield(fut))
+
+
+def stats():
+    with _lock:
+        data = dict(_stats)
+        data["in_flight"] = len(_calls) + len(_async_calls)
+    data["enabled"] = ENABLED
+    # share of reads answered by someone else's round trip
+    data["coalescing_ratio"] = round(data["coalesced"] / data["calls"], 4) if data["calls"] else 0.0
+    return data
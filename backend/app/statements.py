@@ -0,0 +1,106 @@
+# app/statements.py
+"""
+Registry of hot lookup queries run as server-side prepared statements.
+
+Each pooled connection prepares a statement the first time it is used and keeps
+the prepared cursor for the lifetime of the connection, so later calls only send
+the binary-protocol EXECUTE with the bound parameters (no SQL text to parse).
+When a connection is dropped or replaced by the pool its statements go with it.
+
+Identical lookups that run at the same time against the same server share one
+execution (see app/singleflight.py).
+
+Off by default (PREPARED_STATEMENTS=1 turns it on). Both the pure-Python and the
+C-extension connector send COM_STMT_RESET before every execute of a reused
+prepared cursor, so each lookup costs two round trips instead of the text
+protocol's one. For these single-row key lookups the parse time saved is
+smaller than that round trip unless the server is CPU-bound. Measure with
+`python -m bench.prepared_login` (it reports Com_stmt_reset) before turning it on.
+"""
+import os
+import threading
+
+from app import singleflight
+
+STATEMENTS = {
+    "volunteer_by_email": "SELECT id, email, password, name, is_approved FROM volunteers WHERE email = %s",
+    "employee_by_email": "SELECT id, password, name, role FROM employees WHERE email = %s",
+    "employee_by_id": "SELECT id, email, name, role, phone, created_at FROM employees WHERE id = %s",
+    "quiz_by_id": "SELECT id, title, data, created_at, updated_at FROM quizzes WHERE id = %s",
+    "quiz_version": "SELECT id, updated_at FROM quizzes WHERE id = %s",
+}
+
+# set PREPARED_STATEMENTS=1 to use server-side prepared cursors (see above)
+ENABLED = os.getenv("PREPARED_STATEMENTS", "0") == "1"
+
+_stats_lock = threading.Lock()
+_stats = {"prepares": 0, "executions": 0}
+
+
+def _prepared_cursor(conn, name):
+    # cache lives on the connection object: new/reconnected connections start empty
+    cache = getattr(conn, "_finwise_statements", None)
+    if cache is None:
+        cache = {}
+        conn._finwise_statements = cache
+    cur = cache.get(name)
+    if cur is None:
+        cur = conn.cursor(prepared=True, dictionary=True)
+        cache[name] = cur
+        with _stats_lock:
+            _stats["prepares"] += 1
+    return cur
+
+
+def _normalize(row):
+    # the binary protocol hands back JSON/BLOB columns as bytes; handlers expect str
+    if row is None:
+        return None
+    return {k: v.decode("utf-8") if isinstance(v, (bytes, bytearray)) else v for k, v in row.items()}
+
+
+def fetch_one(conn, name, params):
+    """
+    Run registered statement `name` with `params` and return the first row as a dict
+    (or None). Intended for primary-key / unique-key lookups.
+    """
+    # keyed per server so a read pinned to the primary never takes a replica's answer
+    key = ("statement", name, tuple(params), getattr(conn, "_finwise_server", None))
+    return singleflight.do(key, lambda: _execute(conn, name, params))
+
+
+def _execute(conn, name, params):
+    sql = STATEMENTS[name]
+    if not ENABLED:
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(sql, params)
+            return cur.fetchone()
+        finally:
+            cur.close()
+
+    cur = _prepared_cursor(conn, name)
+    try:
+        # passing the same str object lets the cursor skip re-preparing
+        cur.execute(sql, params)
+        rows = cur.fetchall()
+    except Exception:
+        # drop the cursor so the next call re-prepares from a clean state
+        conn._finwise_statements.pop(name, None)
+        try:
+            cur.close()
+        except Exception:
+            pass
+        raise
+    with _stats_lock:
+        _stats["executions"] += 1
+    return _normalize(rows[0]) if rows else None
+
+
+def statement_stats():
+    with _stats_lock:
+        data = dict(_stats)
+    data["enabled"] = ENABLED
+    # executions served without a PREPARE round trip
+    data["reused"] = max(0, data["executions"] - data["prepares"])
+    return data
@@ -0,0 +1,92 @@
+# app/streaming.py
+"""
+Stream large result sets straight from MySQL to the client.
+
+RowStream runs the query on an unbuffered (server-side) cursor and hands rows
+out in fetchmany() batches of STREAM_BATCH_SIZE, so only one batch is ever held
+in memory no matter how many LONGTEXT rows the query returns. ndjson_response
+turns a RowStream into a generator-based Flask response:
+
+    rows = RowStream("SELECT ... FROM blogs ORDER BY id")
+    return ndjson_response(rows)
+
+The query is executed before the response is returned, so a failing query
+still gets a normal JSON error. The connection is held for as long as the
+client keeps reading and goes back to the pool when the response is closed; a
+stream abandoned half way is discarded instead, since the rest of its result
+is still on the wire.
+"""
+import os
+
+from flask import Response, current_app
+from mysql.connector import Error
+
+from app.utils import checkout_stream_connection
+
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+
+class RowStream:
+    """Iterable over the rows of one query on a dedicated, unbuffered cursor."""
+
+    def __init__(self, sql, params=None, batch_size=STREAM_BATCH_SIZE):
+        self.batch_size = batch_size
+        self._pool, self._conn = checkout_stream_connection()
+        self._cur = None
+        self._done = False
+        try:
+            self._cur = self._conn.cursor(dictionary=True, buffered=False)
+            self._cur.execute(sql, params or ())
+        except Exception:
+            self.close(discard=True)
+            raise
+
+    def __iter__(self):
+        try:
+            while True:
+                rows = self._cur.fetchmany(self.batch_size)
+                if not rows:
+                    break
+                yield from rows
+        except Exception:
+            self.close(discard=True)
+            raise
+        self._done = True
+        self.close()
+
+    def close(self, discard=False):
+        if self._conn is None:
+            return
+        conn, self._conn = self._conn, None
+        # an unread result leaves the connection mid-protocol: don't reuse it
+        discard = discard or not self._done
+        if self._cur is not None and not discard:
+            try:
+                self._cur.close()
+            except Exception:
+                discard = True
+        self._pool.release(conn, discard=discard)
+
+
+def _stream(rows, chunks):
+    try:
+        yield from chunks
+    except Error as e:
+        # headers are already sent; all we can do is end the body early
+        print("Streaming query aborted:", e)
+    finally:
+        rows.close()
+
+
+def ndjson_response(rows):
+    """One JSON object per line (application/x-ndjson)."""
+    dumps = current_app.json.dumps   # resolved now: the body is produced after the app context is gone
+
+    def chunks():
+        for row in rows:
+            yield dumps(row) + "\n"
+
+    resp = Response(_stream(rows, chunks()), mimetype="application/x-ndjson")
+    resp.call_on_close(rows.close)
+    return resp
+
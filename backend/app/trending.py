@@ -0,0 +1,223 @@
+# app/trending.py
+"""
+Trending blogs: time-decayed engagement scores, shared by every worker.
+
+Each event (a view, later likes, ...) adds weight * 2^((t - EPOCH) / half-life)
+to the blog's score, i.e. scores use "forward decay": instead of decaying every
+score as time passes, new events are worth exponentially more. Ordering is
+therefore the same as if every past event decayed with half-life
+TRENDING_HALF_LIFE_HOURS, and a score never has to be rewritten just because
+time passed. Scores are kept as log2 of that sum, so they grow by one per
+half-life instead of overflowing.
+
+Events are added up in this worker's memory and written every
+TRENDING_FLUSH_SECONDS as one batched upsert into blog_trending (like the view
+counters), so every worker and every restart reads the same scores. Reading is
+an index range scan for the TRENDING_TOP_K best rows, cached in memory for
+TRENDING_FLUSH_SECONDS. The list is approximate: events still buffered in a
+worker (at most one flush interval old) are not counted yet, and scores are
+floating-point sums.
+"""
+import atexit
+import math
+import os
+import threading
+import time
+
+from app import async_db, drivers
+from app.utils import init_db_connection
+
+TRENDING_HALF_LIFE_HOURS = float(os.getenv("TRENDING_HALF_LIFE_HOURS", "24"))
+TRENDING_TOP_K = int(os.getenv("TRENDING_TOP_K", "50"))
+TRENDING_FLUSH_SECONDS = float(os.getenv("TRENDING_FLUSH_SECONDS", "5"))
+# rows per upsert statement
+TRENDING_FLUSH_BATCH = 500
+
+# event weights
+WEIGHTS = {"view": 1.0, "like": 5.0}
+
+# forward-decay landmark (2024-01-01 UTC); fixed, so every process computes the same scores
+EPOCH = 1704067200.0
+_HALF_LIFE = TRENDING_HALF_LIFE_HOURS * 3600.0
+
+
+def log_weight(weight, now):
+    """log2 of an event's forward-decayed weight."""
+    return math.log2(weight) + (now - EPOCH) / _HALF_LIFE
+
+
+def log_add(a, b):
+    """log2(2^a + 2^b) without leaving float range."""
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log2(1.0 + 2.0 ** (lo - hi))
+
+
+def decayed(score, now):
+    """A stored log2 score as the decayed event weight at `now`."""
+    return 2.0 ** (score - (now - EPOCH) / _HALF_LIFE)
+
+
+_lock = threading.Lock()
+_pending = {}
+_flusher = None
+_flusher_pid = None
+_stop = threading.Event()
+_board = []          # [(blog_id, log2 score)] best first, as last read from blog_trending
+_board_at = None     # time.monotonic() of that read
+_stats = {"events": 0, "flushes": 0, "rows_written": 0, "errors": 0, "loads": 0}
+
+
+def record(blog_id, event="view", now=None):
+    """Count an event for blog_id; no DB work on the caller's thread."""
+    now = time.time() if now is None else now
+    _ensure_flusher()
+    score = log_weight(WEIGHTS.get(event, 1.0), now)
+    with _lock:
+        old = _pending.get(blog_id)
+        _pending[blog_id] = score if old is None else log_add(old, score)
+        _stats["events"] += 1
+
+
+def remove(blog_id):
+    """Forget a deleted blog (its blog_trending row goes with it, ON DELETE CASCADE)."""
+    global _board
+    with _lock:
+        _pending.pop(blog_id, None)
+        _board = [entry for entry in _board if entry[0] != blog_id]
+
+
+async def top(n):
+    """[(blog_id, score)] best first, n <= TRENDING_TOP_K; score = decayed event weight as of now."""
+    global _board, _board_at
+    if _board_at is None or time.monotonic() - _board_at >= TRENDING_FLUSH_SECONDS:
+        rows = await async_db.run(async_db.get_trending(TRENDING_TOP_K))
+        with _lock:
+            _board = [(row["blog_id"], row["score"]) for row in rows]
+            _board_at = time.monotonic()
+            _stats["loads"] += 1
+    now = time.time()
+    return [(blog_id, decayed(score, now)) for blog_id, score in _board[:n]]
+
+
+# ---- flushing ----
+
+def _ensure_flusher():
+    global _flusher, _flusher_pid
+    pid = os.getpid()
+    if _flusher is not None and _flusher_pid == pid and _flusher.is_alive():
+        return
+    with _lock:
+        if _flusher is None or _flusher_pid != pid or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_run, name="trending", daemon=True)
+            _flusher_pid = pid
+            _flusher.start()
+
+
+def _run():
+    while not _stop.wait(TRENDING_FLUSH_SECONDS):
+        try:
+            flush()
+        except Exception as e:
+            # flush() already put the scores back; keep the thread going
+            print("Trending flush crashed:", e)
+
+
+def _upsert(cur, items):
+    # only ids still in blogs: a blog deleted since its events were counted is skipped, not recreated
+    if drivers.DB_DRIVER == "oracle":
+        cur.executemany(
+            "MERGE INTO blog_trending t USING "
+            "(SELECT b.id AS blog_id, CAST(%s AS BINARY_DOUBLE) AS score FROM blogs b WHERE b.id = %s) n "
+            "ON (t.blog_id = n.blog_id) "
+            "WHEN MATCHED THEN UPDATE SET t.score = "
+            "GREATEST(t.score, n.score) + LOG(2, 1 + POWER(2, -ABS(t.score - n.score))) "
+            "WHEN NOT MATCHED THEN INSERT (blog_id, score) VALUES (n.blog_id, n.score)",
+            [(score, blog_id) for blog_id, score in items],
+        )
+        return
+    rows = ", ".join(["ROW(%s, %s)"] * len(items))
+    params = [v for item in items for v in item]
+    cur.execute(
+        "INSERT INTO blog_trending (blog_id, score) "
+        "SELECT n.blog_id, n.score FROM (VALUES " + rows + ") AS n (blog_id, score) "
+        "WHERE EXISTS (SELECT 1 FROM blogs b WHERE b.id = n.blog_id) "
+        "ON DUPLICATE KEY UPDATE blog_trending.score = GREATEST(blog_trending.score, n.score) "
+        "+ LOG2(1 + POW(2, -ABS(blog_trending.score - n.score)))",
+        params,
+    )
+
+
+def flush():
+    """Write buffered scores now; returns the number of blogs written."""
+    with _lock:
+        if not _pending:
+            return 0
+        items = sorted(_pending.items())   # fixed order: concurrent flushes lock rows in the same order
+        _pending.clear()
+    try:
+        pool = init_db_connection()
+        conn = pool.get_connection()
+    except Exception as e:
+        _restore(items, e)
+        return 0
+    discard = False
+    written = 0
+    try:
+        cur = conn.cursor()
+        try:
+            # autocommit: each batch is its own short transaction
+            for i in range(0, len(items), TRENDING_FLUSH_BATCH):
+                _upsert(cur, items[i:i + TRENDING_FLUSH_BATCH])
+                written = i + TRENDING_FLUSH_BATCH
+        finally:
+            cur.close()
+    except Exception as e:
+        discard = True
+        _restore(items[written:], e)
+        return 0
+    finally:
+        pool.release(conn, discard=discard)
+    with _lock:
+        _stats["flushes"] += 1
+        _stats["rows_written"] += len(items)
+    return len(items)
+
+
+def _restore(items, error):
+    print("Trending flush failed, retrying later:", error)
+    with _lock:
+        for blog_id, score in items:
+            old = _pending.get(blog_id)
+            _pending[blog_id] = score if old is None else log_add(old, score)
+        _stats["errors"] += 1
+
+
+def stats():
+    with _lock:
+        data = dict(_stats)
+        data["pending_blogs"] = len(_pending)
+        data["board"] = len(_board)
+    data["k"] = TRENDING_TOP_K
+    data["half_life_hours"] = TRENDING_HALF_LIFE_HOURS
+    data["flush_seconds"] = TRENDING_FLUSH_SECONDS
+    return data
+
+
+def _reset_after_fork():
+    # the parent flushes its own scores; the child starts empty with no thread
+    global _lock, _flusher, _flusher_pid, _board, _board_at
+    _lock = threading.Lock()
+    _pending.clear()
+    _flusher = _flusher_pid = None
+    _board, _board_at = [], None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+@atexit.register
+def _flush_on_exit():
+    _stop.set()
+    if _flusher_pid == os.getpid():
+        flush()
@@ -0,0 +1,198 @@
+# app/updates.py
+"""
+Partial-update engine shared by the PUT/PATCH handlers (blog, course, quiz).
+
+Each table declares its updatable fields once, with an optional normalizer per
+field (raises ValueError with the message to send back as a 400). For a request:
+
+    values = BLOG_UPDATE.validate(payload)          # {field: normalized value}
+    result = BLOG_UPDATE.apply(conn, blog_id, values)
+
+apply() reads the submitted columns of the stored row, and only writes the ones
+whose value actually differs: an edit that changes nothing costs one primary-key
+SELECT and no write (and no cache invalidation). The SELECT and UPDATE text for
+each field combination is built once and reused, so every request with the same
+fields sends byte-identical SQL. Writes also set the table's `touch` column
+(updated_at), which the read routes use for ETag / Last-Modified.
+"""
+import json
+import threading
+from decimal import Decimal
+
+from app.render import derive_blog_fields
+
+NOT_FOUND = "not_found"
+UNCHANGED = "unchanged"
+UPDATED = "updated"
+
+_stats_lock = threading.Lock()
+_stats = {"updates": 0, "unchanged": 0, "not_found": 0, "statements": 0}
+
+
+def _count(name, n=1):
+    with _stats_lock:
+        _stats[name] += n
+
+
+# ---- field normalizers ----
+
+def json_value(value, name="data"):
+    """dict/list -> JSON text, JSON text -> itself (validated), None -> NULL."""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    if isinstance(value, str):
+        try:
+            json.loads(value)
+        except ValueError:
+            raise ValueError("%s must be valid JSON" % name)
+        return value
+    raise ValueError("%s must be an object, array or JSON string" % name)
+
+
+def content_value(value):
+    """Blog content: a string (Markdown subset, see app/render.py) or null."""
+    if value is not None and not isinstance(value, str):
+        raise ValueError("content must be a string")
+    return value
+
+
+# static routes under /blog/ that would shadow GET /blog/<slug>
+RESERVED_SLUGS = frozenset({"export", "import", "search", "trending"})
+
+
+def slug_value(value):
+    """Blog slug: must stay readable at GET /blog/<slug>."""
+    if not isinstance(value, str) or not value:
+        raise ValueError("slug must be a non-empty string")
+    if value in RESERVED_SLUGS or value.isdigit() or "/" in value:
+        raise ValueError("slug %r is reserved (route names, all-digit slugs and '/' are not allowed)" % value)
+    return value
+
+
+def rating_value(value):
+    """Course rating: a number between 0 and 5."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("rating must be a number between 0 and 5")
+    if value < 0 or value > 5:
+        raise ValueError("rating must be between 0 and 5")
+    return value
+
+
+def _same(stored, new, is_json):
+    if isinstance(stored, (bytes, bytearray)):
+        stored = stored.decode("utf-8")
+    if stored is None or new is None:
+        return stored is None and new is None
+    if is_json:
+        # MySQL re-serializes JSON columns, so compare the parsed documents
+        try:
+            return json.loads(stored) == json.loads(new)
+        except (TypeError, ValueError):
+            return False
+    if isinstance(stored, Decimal) and isinstance(new, (int, float)):
+        return stored == Decimal(str(new))
+    return stored == new
+
+
+class PartialUpdate:
+    def __init__(self, table, fields, json_fields=(), touch=None, derive=None):
+        """
+        fields: {column: normalizer or None}, in the order columns appear in the SQL.
+        derive: optional fn(values) -> {column: value} of extra columns computed
+        from the submitted ones (e.g. rendered HTML from content).
+        """
+        self.table = table
+        self.fields = fields
+        self.json_fields = set(json_fields)
+        self.touch = touch
+        self.derive = derive
+        self._compiled = {}
+        self._lock = threading.Lock()
+
+    def validate(self, payload):
+        names = [f for f in self.fields if f in payload]
+        if not names:
+            raise ValueError("no updatable fields provided")
+        values = {}
+        for f in names:
+            normalize = self.fields[f]
+            values[f] = normalize(payload[f]) if normalize else payload[f]
+        if self.derive:
+            values.update(self.derive(values))
+        return values
+
+    def _statements(self, names):
+        compiled = self._compiled.get(names)
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(names)
+                if compiled is None:
+                    assignments = [f + " = %s" for f in names]
+                    if self.touch:
+                        assignments.append(self.touch + " = CURRENT_TIMESTAMP(6)")
+                    compiled = (
+                        "SELECT %s FROM %s WHERE id = %%s" % (", ".join(names), self.table),
+                        "UPDATE %s SET %s WHERE id = %%s" % (self.table, ", ".join(assignments)),
+                    )
+                    self._compiled[names] = compiled
+                    _count("statements")
+        return compiled
+
+    def apply(self, conn, row_id, values, before=None):
+        """
+        Write the fields of `values` that differ from row `row_id`; returns UPDATED,
+        UNCHANGED or NOT_FOUND. Pass a dict as `before` to get the stored values back.
+        """
+        names = tuple(values)
+        cur = conn.cursor(dictionary=True)
+        try:
+            cur.execute(self._statements(names)[0], (row_id,))
+            row = cur.fetchone()
+            if row is None:
+                _count("not_found")
+                return NOT_FOUND
+            if before is not None:
+                before.update(row)
+            changed = tuple(f for f in names if not _same(row[f], values[f], f in self.json_fields))
+            if not changed:
+                _count("unchanged")
+                return UNCHANGED
+            cur.execute(self._statements(changed)[1], tuple(values[f] for f in changed) + (row_id,))
+            _count("updates")
+            return UPDATED
+        finally:
+            cur.close()
+
+
+def update_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+BLOG_UPDATE = PartialUpdate("blogs", {
+    "title": None,
+    "slug": slug_value,
+    "content": content_value,
+    "image_url": None,
+    "image_alt": None,
+    "image_caption": None,
+    "author_id": None,
+}, touch="updated_at", derive=derive_blog_fields)
+
+COURSE_UPDATE = PartialUpdate("courses", {
+    "title": None,
+    "description": None,
+    "rating": rating_value,
+    "thumbnail_url": None,
+    "video_url": None,
+    "content": None,
+}, touch="updated_at")
+
+QUIZ_UPDATE = PartialUpdate("quizzes", {
+    "title": None,
+    "data": json_value,
+}, json_fields=("data",), touch="updated_at")
@@ -1,28 +1,561 @@
-import mysql.connector
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
 from mysql.connector import Error
+from mysql.connector.errors import PoolError
+from flask import g, has_app_context, has_request_context, jsonify, request, session
+
+from app import drivers
+from app.instrumentation import InstrumentedConnection
+
+DB_CONFIG = {
+    "host": os.getenv("MYSQL_HOST", "localhost"),
+    "port": int(os.getenv("MYSQL_PORT", "3306")),
+    "user": os.getenv("MYSQL_USER", "root"),
+    "password": os.getenv("MYSQL_PASSWORD", "root"),
+    "database": os.getenv("MYSQL_DATABASE", "finwise"),
+    "autocommit": True,
+    # fail a connect attempt quickly instead of stalling the request
+    "connection_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", "3")),
+}
+
+# read replicas as "host:port,host:port" (same user/password/database as the primary).
+# Empty = every query goes to the primary. Pointing this at the primary itself is a
+# handy local stand-in for testing the routing.
+REPLICA_HOSTS = [h.strip() for h in os.getenv("MYSQL_REPLICA_HOSTS", "").split(",") if h.strip()]
+# after a session writes, its reads stay on the primary for this many seconds
+READ_STICKY_SECONDS = float(os.getenv("DB_READ_STICKY_SECONDS", "5"))
+
+
+def _replica_config(hostport):
+    host, _, port = hostport.partition(":")
+    config = dict(DB_CONFIG, host=host)
+    if port:
+        config["port"] = int(port)
+    return config
+
+# wrap pooled connections so every statement is timed (see app/instrumentation.py)
+QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "1") != "0"
+
+# CR_SERVER_GONE_ERROR, CR_SERVER_LOST, CR_SERVER_LOST_EXTENDED
+LOST_CONNECTION_ERRNOS = (2006, 2013, 2055)
+
+# pool sizing (override via env)
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "5"))
+# only ping connections that sat idle longer than this (seconds); 0 = ping on every checkout
+POOL_VALIDATE_IDLE = float(os.getenv("DB_POOL_VALIDATE_IDLE", "30"))
+
+# circuit breaker: open after this many consecutive connect failures, then back off
+# (exponential with jitter, from BASE up to MAX seconds) before letting one probe through
+BREAKER_THRESHOLD = int(os.getenv("DB_BREAKER_THRESHOLD", "3"))
+BREAKER_BACKOFF_BASE = float(os.getenv("DB_BREAKER_BACKOFF_BASE", "1"))
+BREAKER_BACKOFF_MAX = float(os.getenv("DB_BREAKER_BACKOFF_MAX", "30"))
+
+
+class DatabaseUnavailable(Error):
+    """Raised without touching the network while the circuit breaker is open."""
+
+    def __init__(self, retry_after):
+        super().__init__(msg="database unavailable, retry in %.1fs" % retry_after)
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Guards connect attempts to one server.
+    closed: connects go through; BREAKER_THRESHOLD consecutive failures open it.
+    open: callers fail fast with DatabaseUnavailable until the backoff expires.
+    half-open: exactly one caller probes; success closes the breaker, failure
+    re-opens it with the next (doubled, jittered) backoff.
+    """
+
+    def __init__(self, threshold=3, base=1.0, maximum=30.0):
+        self.threshold = threshold
+        self.base = base
+        self.maximum = maximum
+        self._lock = threading.Lock()
+        self._state = "closed"
+        self._failures = 0
+        self._opens = 0           # consecutive opens, drives the backoff exponent
+        self._open_until = 0.0
+        self._probing = False
+        self._counters = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def before_connect(self):
+        with self._lock:
+            if self._state == "closed":
+                return
+            now = time.monotonic()
+            if self._state == "open" and now >= self._open_until:
+                self._state = "half-open"
+            if self._state == "half-open" and not self._probing:
+                self._probing = True
+                self._counters["probes"] += 1
+                return
+            self._counters["rejected"] += 1
+            retry_after = max(self._open_until - now, 0.5)
+        raise DatabaseUnavailable(retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._opens = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half-open" or self._failures >= self.threshold:
+                delay = min(self.maximum, self.base * (2 ** self._opens))
+                # equal jitter: spread workers' probes so they don't reconnect in lockstep
+                delay = delay / 2 + random.uniform(0, delay / 2)
+                self._state = "open"
+                self._open_until = time.monotonic() + delay
+                self._opens += 1
+                self._counters["opened"] += 1
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            data = dict(self._counters)
+            data["state"] = self._state
+            data["consecutive_failures"] = self._failures
+            if self._state == "open":
+                data["retry_after"] = round(max(self._open_until - time.monotonic(), 0.0), 3)
+        return data
+
+
+class ConnectionPool:
+    """
+    Bounded pool of MySQL connections.
+    Keeps up to min_size connections warm, never opens more than max_size,
+    and makes callers wait up to `timeout` seconds for a free connection
+    before raising PoolError.
+    A connection is only pinged on checkout if it has been idle for longer
+    than `validate_idle` seconds; recently used ones are handed out as-is.
+    """
+
+    def __init__(self, config, min_size=1, max_size=10, timeout=5.0, validate_idle=30.0):
+        if max_size < 1:
+            raise ValueError("max_size must be >= 1")
+        self.config = dict(config)
+        self.min_size = max(0, min(min_size, max_size))
+        self.max_size = max_size
+        self.timeout = timeout
+        self.validate_idle = validate_idle
+        self.breaker = CircuitBreaker(BREAKER_THRESHOLD, BREAKER_BACKOFF_BASE, BREAKER_BACKOFF_MAX)
+        self._idle = []     # (conn, released_at); LIFO so the warmest connection is reused first
+        self._size = 0      # connections opened by this pool (idle + in use)
+        self._cond = threading.Condition()
+        self._counters = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "created": 0,
+            "discarded": 0,
+            "pings": 0,
+            "reconnects": 0,
+            "wait_time": 0.0,
+        }
+
+    def _connect(self):
+        self.breaker.before_connect()
+        try:
+            conn = drivers.connect(self.config)
+        except BaseException:
+            # not just Error: anything else would leave a half-open probe pending forever
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        if QUERY_INSTRUMENTATION:
+            conn = InstrumentedConnection(conn)
+        # which server this connection talks to (keys single-flight reads, see app/singleflight.py)
+        conn._finwise_server = "%s:%s" % (self.config.get("host"), self.config.get("port"))
+        with self._cond:
+            self._counters["created"] += 1
+        return conn
+
+    def fill(self):
+        """Open connections until min_size are available."""
+        while True:
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def get_connection(self):
+        start = time.monotonic()
+        deadline = start + self.timeout
+        with self._cond:
+            self._counters["checkouts"] += 1
+            waited = False
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolError(
+                        "connection pool exhausted (%d in use)" % self._size
+                    )
+                if not waited:
+                    self._counters["waits"] += 1
+                    waited = True
+                self._cond.wait(remaining)
+            if waited:
+                self._counters["wait_time"] += time.monotonic() - start
+            if self._idle:
+                conn, released_at = self._idle.pop()
+            else:
+                # reserve a slot now, connect outside the lock
+                conn = None
+                self._size += 1
+
+        if conn is not None and time.monotonic() - released_at >= self.validate_idle:
+            # is_connected() is a server round trip, so only pay it for stale connections
+            alive = conn.is_connected()
+            with self._cond:
+                self._counters["pings"] += 1
+                if not alive:
+                    self._counters["reconnects"] += 1
+            if not alive:
+                self._close(conn)
+                conn = None
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+        return conn
+
+    def release(self, conn, discard=False):
+        """Return a connection to the pool (or drop it if discard=True)."""
+        if not discard:
+            try:
+                # never hand the next request an open transaction
+                if conn.in_transaction:
+                    conn.rollback()
+            except Exception:
+                discard = True
+        with self._cond:
+            if discard:
+                self._size -= 1
+                self._counters["discarded"] += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if discard:
+            self._close(conn)
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn, _ in idle:
+            self._close(conn)
+
+    @staticmethod
+    def _close(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def stats(self):
+        with self._cond:
+            data = dict(self._counters)
+            data.update({
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+            })
+        data["wait_time"] = round(data["wait_time"], 6)
+        data["breaker"] = self.breaker.stats()
+        return data
+
+
+db_pool = None
+replica_pools = []
+_replica_next = 0
+_pool_pid = None
+_pool_lock = threading.Lock()
+# pools inherited from a parent process; kept referenced (never closed) so that
+# garbage collection can't shut down sockets the parent is still using
+_inherited_pools = []
+
+
+def init_db_connection(warm=False):
+    """
+    Return this process's pool, creating it on first use.
+    No connection is opened here unless warm=True, so importing the app and
+    booting workers never blocks on MySQL.
+    """
+    global db_pool, replica_pools, _pool_pid
+    pid = os.getpid()
+    if db_pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if db_pool is not None and _pool_pid != pid:
+                # forked without the at-fork hook running (shouldn't happen on CPython 3.7+)
+                _abandon_pool()
+            if db_pool is None:
+                db_pool = ConnectionPool(
+                    DB_CONFIG,
+                    min_size=POOL_MIN_SIZE,
+                    max_size=POOL_MAX_SIZE,
+                    timeout=POOL_TIMEOUT,
+                    validate_idle=POOL_VALIDATE_IDLE,
+                )
+                replica_pools = [
+                    ConnectionPool(
+                        _replica_config(hostport),
+                        min_size=POOL_MIN_SIZE,
+                        max_size=POOL_MAX_SIZE,
+                        timeout=POOL_TIMEOUT,
+                        validate_idle=POOL_VALIDATE_IDLE,
+                    )
+                    for hostport in REPLICA_HOSTS
+                ]
+                _pool_pid = pid
+    if warm:
+        try:
+            db_pool.fill()
+            print("Database connection pool ready:", db_pool.stats())
+        except Error as e:
+            print("Error connecting to MySQL:", e)
+    return db_pool
+
+
+def _abandon_pool():
+    global db_pool, replica_pools, _pool_pid
+    if db_pool is not None:
+        _inherited_pools.append(db_pool)
+    _inherited_pools.extend(replica_pools)
+    db_pool = None
+    replica_pools = []
+    _pool_pid = None
 
-db_connection = None
 
-def init_db_connection():
-    global db_connection
+def reset_after_fork():
+    """
+    Post-fork hook (runs in the child): drop the parent's pool without touching
+    its sockets; the child opens its own connections lazily on first request.
+    """
+    global _pool_lock
+    # the parent may have held the lock mid-fork
+    _pool_lock = threading.Lock()
+    _abandon_pool()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
+
+
+def get_db_connection():
+    """
+    Check out a pooled (primary) connection for the current request.
+    The same connection is returned for the rest of the request and goes
+    back to the pool on app-context teardown (see init_app).
+    """
+    conn = _primary_connection()
+    _note_write()
+    return conn
+
+
+def _primary_connection():
+    pool = init_db_connection()
+    if not has_app_context():
+        # scripts / shells: caller owns the connection and must release_db_connection() it
+        return pool.get_connection()
+    conn = g.get("db_conn")
+    if conn is None:
+        conn = pool.get_connection()
+        g.db_conn = conn
+    return conn
+
+
+_route_lock = threading.Lock()
+_route_counters = {"replica": 0, "primary": 0, "fallback": 0}
+
+
+def _note_write():
+    # a primary checkout from a mutating request pins this session's reads to the primary
+    if replica_pools and has_request_context() and request.method not in ("GET", "HEAD", "OPTIONS"):
+        session["db_wrote_at"] = time.time()
+
+
+def _recent_write():
+    if not has_request_context():
+        return False
+    wrote_at = session.get("db_wrote_at")
+    return wrote_at is not None and time.time() - wrote_at < READ_STICKY_SECONDS
+
+
+def _next_replica_pool():
+    global _replica_next
+    with _pool_lock:
+        pool = replica_pools[_replica_next % len(replica_pools)]
+        _replica_next += 1
+    return pool
+
+
+def get_read_connection():
+    """
+    Connection for read-only handlers.
+    Goes to a replica (round robin) unless no replicas are configured, the request
+    already holds a primary connection, or this session wrote within the last
+    READ_STICKY_SECONDS (read-your-writes). Falls back to the primary if the
+    replica can't be reached.
+    """
+    init_db_connection()
+    if not replica_pools or not has_app_context() or g.get("db_conn") is not None or _recent_write():
+        with _route_lock:
+            _route_counters["primary"] += 1
+        return _primary_connection()
+    held = g.get("db_read")
+    if held is not None:
+        return held[1]
+    pool = _next_replica_pool()
     try:
-        db_connection = mysql.connector.connect(
-            host="localhost",
-            user="root",
-            password="root",
-            database="finwise",
-            autocommit=True
-        )
-        if db_connection.is_connected():
-            print("Global database connection established.")
+        conn = pool.get_connection()
     except Error as e:
-        print("Error connecting to MySQL:", e)
-        db_connection = None
+        print("Replica unavailable, reading from primary:", e)
+        with _route_lock:
+            _route_counters["fallback"] += 1
+        return _primary_connection()
+    g.db_read = (pool, conn)
+    with _route_lock:
+        _route_counters["replica"] += 1
+    return conn
 
-init_db_connection()
 
-def get_db_connection():
-    global db_connection
-    if db_connection is None or not db_connection.is_connected():
-        init_db_connection()
-    return db_connection
+def checkout_stream_connection():
+    """
+    (pool, conn) for a streamed response (app/streaming.py). Routed like
+    get_read_connection(), but not tied to the request: the response body is
+    still being read after teardown, so the caller releases it with pool.release().
+    """
+    pool = init_db_connection()
+    if replica_pools and not _recent_write():
+        replica = _next_replica_pool()
+        try:
+            return replica, replica.get_connection()
+        except Error as e:
+            print("Replica unavailable, streaming from primary:", e)
+            with _route_lock:
+                _route_counters["fallback"] += 1
+    return pool, pool.get_connection()
+
+
+_tx_lock = threading.Lock()
+_tx_counters = {"commits": 0, "rollbacks": 0}
+
+
+@contextmanager
+def transaction(conn=None):
+    """
+    Unit of work: statements run inside the block share one transaction and
+    one commit; any exception rolls the whole block back and re-raises.
+
+        with transaction(conn):
+            cur.execute(...)
+            cur.execute(...)
+    """
+    conn = conn or get_db_connection()
+    conn.start_transaction()
+    try:
+        yield conn
+    except BaseException:
+        try:
+            conn.rollback()
+        finally:
+            with _tx_lock:
+                _tx_counters["rollbacks"] += 1
+        raise
+    conn.commit()
+    with _tx_lock:
+        _tx_counters["commits"] += 1
+
+
+def transaction_stats():
+    with _tx_lock:
+        return dict(_tx_counters)
+
+
+def mark_connection_lost(e):
+    """Flag the request's connection for disposal if `e` means the socket is gone."""
+    if has_app_context() and getattr(e, "errno", None) in LOST_CONNECTION_ERRNOS:
+        g.db_conn_lost = True
+
+
+def release_db_connection(conn, discard=False):
+    if conn is not None and db_pool is not None:
+        db_pool.release(conn, discard=discard)
+
+
+def pool_stats():
+    if db_pool is None:
+        return {}
+    data = db_pool.stats()
+    data["transactions"] = transaction_stats()
+    if drivers.DB_DRIVER == "oracle":
+        from app import oracle
+        data["oracle_pool"] = oracle.pool_stats()
+    if replica_pools:
+        data["replicas"] = [p.stats() for p in replica_pools]
+        with _route_lock:
+            data["read_routing"] = dict(_route_counters)
+    return data
+
+
+def init_app(app):
+    """
+    Hook the pool into a Flask app: per-request checkout + return on teardown.
+    Connections are opened lazily; set DB_POOL_WARM=1 to open min_size at startup
+    (only sensible when the app is not pre-forked afterwards).
+    """
+    init_db_connection(warm=os.getenv("DB_POOL_WARM") == "1")
+
+    @app.teardown_appcontext
+    def _return_db_connection(exc):
+        conn = g.pop("db_conn", None)
+        read = g.pop("db_read", None)
+        # a connection lost mid-request is dropped instead of going back to the pool
+        lost = g.pop("db_conn_lost", False)
+        release_db_connection(conn, discard=lost)
+        if read is not None:
+            read[0].release(read[1], discard=lost)
+
+    @app.errorhandler(DatabaseUnavailable)
+    def _db_unavailable(e):
+        resp = jsonify({"error": "database unavailable", "details": str(e)})
+        resp.headers["Retry-After"] = str(max(1, int(round(e.retry_after))))
+        return resp, 503
+
+    @app.errorhandler(PoolError)
+    def _pool_exhausted(e):
+        return jsonify({"error": "database busy", "details": str(e)}), 503
+
+    @app.errorhandler(Error)
+    def _db_error(e):
+        mark_connection_lost(e)
+        # connection failures raised before a handler's own try block
+        return jsonify({"error": "db connection error", "details": str(e)}), 500
@@ -1,7 +1,8 @@
 # app/volunteer_routes.py
 from flask import Blueprint, request, jsonify, session
 from mysql.connector import Error
-from app.utils import get_db_connection
+from app.utils import get_db_connection, get_read_connection, mark_connection_lost, transaction
+from app.statements import fetch_one
 import hashlib
 def _sha256_hex(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
@@ -35,31 +36,32 @@ def register_volunteer():
     try:
         cur = conn.cursor()
         try:
-            # Insert volunteer
             insert_vol_sql = """
                 INSERT INTO volunteers (email, password, name, phone)
                 VALUES (%s, %s, %s, %s)
             """
-            cur.execute(insert_vol_sql, (email, password, name, phone))
-            volunteer_id = cur.lastrowid
-
-            # Create pending approval row
             insert_app_sql = """
                 INSERT INTO approvals (volunteer_id, admin_id, status, comment)
                 VALUES (%s, %s, %s, %s)
             """
-            cur.execute(insert_app_sql, (volunteer_id, None, "pending", initial_comment))
+            # volunteer + pending approval commit together (one commit) or not at all
+            with transaction(conn):
+                # Insert volunteer
+                cur.execute(insert_vol_sql, (email, password, name, phone))
+                volunteer_id = cur.lastrowid
 
-            # If autocommit is off, uncomment the next line
-            # conn.commit()
+                # Create pending approval row
+                cur.execute(insert_app_sql, (volunteer_id, None, "pending", initial_comment))
+                approval_id = cur.lastrowid
 
             return jsonify({
                 "message": "registered (pending approval)",
                 "volunteer_id": volunteer_id,
-                "approval_id": cur.lastrowid
+                "approval_id": approval_id
             }), 201
 
         except Error as e:
+            mark_connection_lost(e)
             # Duplicate email error code for MySQL is 1062
             if getattr(e, "errno", None) == 1062:
                 return jsonify({"error": "email already exists"}), 409
@@ -89,43 +91,34 @@ def volunteer_login():
     if not email or not password:
         return jsonify({"error": "email and password are required"}), 400
 
-    conn = get_db_connection()
+    conn = get_read_connection()   # replica unless this session just wrote
     try:
-        cur = conn.cursor(dictionary=True)
-        try:
-            # Get volunteer info
-            select_sql = """
-                SELECT id, email, password, name, is_approved
-                FROM volunteers
-                WHERE email = %s
-            """
-            cur.execute(select_sql, (email,))
-            volunteer = cur.fetchone()
+        # Get volunteer info (registered lookup, see app/statements.py)
+        volunteer = fetch_one(conn, "volunteer_by_email", (email,))
 
-            if not volunteer:
-                return jsonify({"error": "invalid credentials"}), 401
+        if not volunteer:
+            return jsonify({"error": "invalid credentials"}), 401
 
-            # Check password (you may want to use proper password hashing comparison)
-            if volunteer["password"] != _sha256_hex(password):
-                return jsonify({"error": "invalid credentials"}), 401
+        # Check password (you may want to use proper password hashing comparison)
+        if volunteer["password"] != _sha256_hex(password):
+            return jsonify({"error": "invalid credentials"}), 401
 
-            # Check if volunteer is approved
-            if not volunteer["is_approved"]:
-                return jsonify({"error": "account not approved yet"}), 403
+        # Check if volunteer is approved
+        if not volunteer["is_approved"]:
+            return jsonify({"error": "account not approved yet"}), 403
 
-            # Store volunteer ID in session
-            session["volunteer_id"] = volunteer["id"]
+        # Store volunteer ID in session
+        session["volunteer_id"] = volunteer["id"]
 
-            return jsonify({
-                "message": "login successful",
-                "volunteer_id": volunteer["id"],
-                "name": volunteer["name"]
-            }), 200
+        return jsonify({
+            "message": "login successful",
+            "volunteer_id": volunteer["id"],
+            "name": volunteer["name"]
+        }), 200
 
-        except Error as e:
-            return jsonify({"error": str(e)}), 500
-        finally:
-            cur.close()
+    except Error as e:
+        mark_connection_lost(e)
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         return jsonify({"error": "db connection error", "details": str(e)}), 500
 
@@ -176,31 +169,32 @@ def approve_or_reject():
     try:
         cur = conn.cursor()
         try:
-            # Update volunteer approval flag
             update_sql = """
                 UPDATE volunteers
                 SET is_approved = %s
                 WHERE id = %s
             """
-            cur.execute(update_sql, (is_approved_value, volunteer_id))
-
-            # Insert an approvals audit row
             insert_app_sql = """
                 INSERT INTO approvals (volunteer_id, admin_id, status, comment)
                 VALUES (%s, %s, %s, %s)
             """
-            cur.execute(insert_app_sql, (volunteer_id, admin_id, new_status, comment))
+            # flag update + audit row commit together (one commit) or not at all
+            with transaction(conn):
+                # Update volunteer approval flag
+                cur.execute(update_sql, (is_approved_value, volunteer_id))
 
-            # If autocommit is off, uncomment:
-            # conn.commit()
+                # Insert an approvals audit row
+                cur.execute(insert_app_sql, (volunteer_id, admin_id, new_status, comment))
+                approval_id = cur.lastrowid
 
             return jsonify({
                 "message": f"volunteer {new_status}",
                 "volunteer_id": volunteer_id,
-                "approval_id": cur.lastrowid
+                "approval_id": approval_id
             }), 200
 
         except Error as e:
+            mark_connection_lost(e)
             return jsonify({"error": str(e)}), 500
         finally:
             cur.close()
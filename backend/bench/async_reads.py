@@ -0,0 +1,80 @@
+# bench/async_reads.py
+"""
+Concurrent course lookups: sync pooled path vs the async (mysql.connector.aio) path.
+
+The sync path runs N worker threads sharing a ConnectionPool of --pool-size
+connections, like threaded Flask workers. The async path issues the same number of
+lookups as coroutines on the app's DB loop with an aio pool of the same size.
+--sleep adds a server-side SLEEP() to each query to make DB wait time dominate.
+
+    python -m bench.async_reads --concurrency 64 --requests 2000 --pool-size 8
+"""
+import argparse
+import asyncio
+import time
+
+from app import async_db, singleflight
+from app.utils import DB_CONFIG, ConnectionPool
+from bench.common import report, run_threads
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--sleep", type=float, default=0.0, help="server-side SLEEP per query (seconds)")
+    args = parser.parse_args()
+    # measure the statements themselves: identical concurrent lookups would
+    # otherwise be coalesced into one round trip (app/singleflight.py)
+    singleflight.ENABLED = False
+
+    sql = "SELECT id, title, rating, created_at, SLEEP(%s) AS s FROM courses WHERE id = %s"
+    per_thread = max(1, args.requests // args.concurrency)
+
+    # --- sync: threads contend for a bounded pool ---
+    pool = ConnectionPool(DB_CONFIG, min_size=args.pool_size, max_size=args.pool_size, timeout=60)
+    pool.fill()
+
+    def sync_lookup(idx, i):
+        conn = pool.get_connection()
+        try:
+            cur = conn.cursor(dictionary=True)
+            cur.execute(sql, (args.sleep, 1 + (idx + i) % 10))
+            cur.fetchall()
+            cur.close()
+        finally:
+            pool.release(conn)
+
+    latencies, wall = run_threads(sync_lookup, args.concurrency, per_thread)
+    report("sync threads", latencies, wall)
+    pool.close_all()
+
+    # --- async: coroutines on one loop ---
+    async_db.ASYNC_POOL_SIZE = args.pool_size
+    total = per_thread * args.concurrency
+
+    async def one(i, out):
+        t0 = time.perf_counter()
+        await async_db.fetch_all(sql, (args.sleep, 1 + i % 10))
+        out.append(time.perf_counter() - t0)
+
+    async def many():
+        out = []
+        sem = asyncio.Semaphore(args.concurrency)
+
+        async def limited(i):
+            async with sem:
+                await one(i, out)
+
+        await asyncio.gather(*(limited(i) for i in range(total)))
+        return out
+
+    async_db.run_sync(async_db.fetch_all("SELECT 1"))   # warm up loop + pool
+    start = time.perf_counter()
+    latencies = asyncio.run_coroutine_threadsafe(many(), async_db._get_loop()).result()
+    report("async (aio pool)", latencies, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+# bench/common.py
+"""Small helpers shared by the benchmark scripts in this folder."""
+import statistics
+import threading
+import time
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+def run_threads(worker, threads, iterations):
+    """
+    Run worker(thread_index, iteration) `iterations` times on each of `threads`
+    threads. Returns (per-call latencies in seconds, wall-clock seconds).
+    """
+    latencies = []
+    lock = threading.Lock()
+
+    def loop(idx):
+        local = []
+        for i in range(iterations):
+            t0 = time.perf_counter()
+            worker(idx, i)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=loop, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return latencies, time.perf_counter() - start
+
+
+def report(label, latencies, wall, extra=None):
+    ms = [x * 1000 for x in latencies]
+    line = "%-28s n=%-6d qps=%-9.0f mean=%.3fms p50=%.3fms p95=%.3fms p99=%.3fms" % (
+        label,
+        len(ms),
+        len(ms) / wall if wall else 0.0,
+        statistics.fmean(ms) if ms else 0.0,
+        percentile(ms, 50),
+        percentile(ms, 95),
+        percentile(ms, 99),
+    )
+    if extra:
+        line += "  " + " ".join("%s=%s" % kv for kv in extra.items())
+    print(line)
@@ -0,0 +1,105 @@
+# bench/drivers.py
+"""
+Compare the drivers behind app/drivers.py on the finwise schema.
+
+Creates a scratch copy of the blogs table (bench_blogs, same DDL as db/schema.sql
+via CREATE TABLE ... LIKE), fills it with --rows posts of --content-size bytes,
+then for every driver that is installed measures:
+  * decode throughput: SELECT * over the whole table into dict rows (rows/s, MB/s)
+  * point lookups: SELECT by primary key, per-query latency percentiles
+
+    python -m bench.drivers --rows 5000 --content-size 4000 --lookups 5000
+"""
+import argparse
+import time
+
+import mysql.connector
+
+from app import drivers
+from app.utils import DB_CONFIG
+from bench.common import report, run_threads
+
+
+def _setup(rows, content_size):
+    conn = drivers.connect(DB_CONFIG, "connector")
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS bench_blogs")
+    cur.execute("CREATE TABLE bench_blogs LIKE blogs")
+    body = ("lorem ipsum dolor sit amet " * (content_size // 27 + 1))[:content_size]
+    batch = [
+        ("Post %d" % i, "bench-post-%d" % i, body, "https://cdn.example/%d.jpg" % i, "alt", "caption", None)
+        for i in range(rows)
+    ]
+    for start in range(0, rows, 1000):
+        cur.executemany(
+            "INSERT INTO bench_blogs (title, slug, content, image_url, image_alt, image_caption, author_id) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+            batch[start:start + 1000],
+        )
+    conn.commit()
+    cur.close()
+    conn.close()
+
+
+def _teardown():
+    conn = drivers.connect(DB_CONFIG, "connector")
+    cur = conn.cursor()
+    cur.execute("DROP TABLE IF EXISTS bench_blogs")
+    cur.close()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--content-size", type=int, default=4000)
+    parser.add_argument("--lookups", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    _setup(args.rows, args.content_size)
+    try:
+        for name in drivers.DRIVERS:
+            if name == "oracle":
+                # the scratch table lives in MySQL
+                continue
+            if name == "connector-c" and not mysql.connector.HAVE_CEXT:
+                # connect() would fall back to pure Python and time the same thing as "connector"
+                print("%-12s skipped (C extension not available)" % name)
+                continue
+            try:
+                conn = drivers.connect(DB_CONFIG, name)
+            except ImportError as e:
+                print("%-12s skipped (%s)" % (name, e))
+                continue
+
+            best = None
+            for _ in range(args.repeat):
+                cur = conn.cursor(dictionary=True)
+                t0 = time.perf_counter()
+                cur.execute("SELECT * FROM bench_blogs")
+                rows = cur.fetchall()
+                elapsed = time.perf_counter() - t0
+                cur.close()
+                best = elapsed if best is None else min(best, elapsed)
+            assert len(rows) == args.rows and isinstance(rows[0], dict)
+            mb = args.rows * args.content_size / 1e6
+            print("%-12s decode: %d rows in %.3fs  %.0f rows/s  %.1f MB/s" % (name, len(rows), best, len(rows) / best, mb / best))
+
+            ids = [r["id"] for r in rows]
+
+            def lookup(_, i):
+                c = conn.cursor(dictionary=True)
+                c.execute("SELECT id, title, slug, created_at FROM bench_blogs WHERE id = %s", (ids[i % len(ids)],))
+                c.fetchall()
+                c.close()
+
+            latencies, wall = run_threads(lookup, 1, args.lookups)
+            report("%s pk lookup" % name, latencies, wall)
+            conn.close()
+    finally:
+        _teardown()
+
+
+if __name__ == "__main__":
+    main()
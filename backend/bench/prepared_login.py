@@ -0,0 +1,73 @@
+# bench/prepared_login.py
+"""
+Login-path lookup: plain text-protocol cursor vs the prepared statement registry.
+
+Needs the finwise schema + seed loaded (db/schema.sql, db/seed.sql) and the
+MYSQL_* env vars pointing at it. Each thread owns one connection, like a pooled
+request worker. Server-side Com_* counters show how many statements MySQL had
+to parse for each mode, and how many extra COM_STMT_RESET round trips the
+prepared mode cost. Both modes are measured whatever PREPARED_STATEMENTS is set to.
+
+    python -m bench.prepared_login --threads 8 --iterations 2000
+"""
+import argparse
+
+import mysql.connector
+
+from app import singleflight, statements
+from app.utils import DB_CONFIG
+from app.statements import STATEMENTS, fetch_one
+from bench.common import report, run_threads
+
+EMAIL = "employee@example.com"
+
+
+def _status(conn, names):
+    cur = conn.cursor()
+    cur.execute("SHOW GLOBAL STATUS WHERE Variable_name IN (%s)" % ", ".join(["%s"] * len(names)), tuple(names))
+    data = {k: int(v) for k, v in cur.fetchall()}
+    cur.close()
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    # measure the statements themselves: identical concurrent lookups would
+    # otherwise be coalesced into one round trip (app/singleflight.py)
+    singleflight.ENABLED = False
+    # compare both modes whatever PREPARED_STATEMENTS is set to
+    statements.ENABLED = True
+
+    conns = [mysql.connector.connect(**DB_CONFIG) for _ in range(args.threads)]
+    admin = mysql.connector.connect(**DB_CONFIG)
+    counters = ["Com_select", "Com_stmt_prepare", "Com_stmt_execute", "Com_stmt_reset"]
+    sql = STATEMENTS["employee_by_email"]
+
+    def text_lookup(idx, _):
+        cur = conns[idx].cursor(dictionary=True)
+        cur.execute(sql, (EMAIL,))
+        cur.fetchone()
+        cur.close()
+
+    def prepared_lookup(idx, _):
+        fetch_one(conns[idx], "employee_by_email", (EMAIL,))
+
+    for label, worker in (("text protocol", text_lookup), ("prepared (registry)", prepared_lookup)):
+        # warm up connections / prepare once per connection
+        for idx in range(args.threads):
+            worker(idx, 0)
+        before = _status(admin, counters)
+        latencies, wall = run_threads(worker, args.threads, args.iterations)
+        after = _status(admin, counters)
+        delta = {k: after[k] - before[k] for k in counters}
+        report(label, latencies, wall, delta)
+
+    for conn in conns + [admin]:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
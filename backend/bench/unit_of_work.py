@@ -0,0 +1,83 @@
+# bench/unit_of_work.py
+"""
+Two-statement writes (like register_volunteer / approve_or_reject):
+two auto-committed statements vs one transaction() with a single commit.
+
+Creates and drops two scratch InnoDB tables (bench_uow_parent / bench_uow_child)
+in the configured database. Reports latency per request plus the server's
+Handler_commit and Innodb_os_log_fsyncs deltas per request.
+
+    python -m bench.unit_of_work --threads 4 --iterations 500
+"""
+import argparse
+
+import mysql.connector
+
+from app.utils import DB_CONFIG, transaction
+from bench.common import report, run_threads
+
+SETUP = [
+    "DROP TABLE IF EXISTS bench_uow_child",
+    "DROP TABLE IF EXISTS bench_uow_parent",
+    "CREATE TABLE bench_uow_parent (id INT PRIMARY KEY AUTO_INCREMENT, email VARCHAR(255)) ENGINE=InnoDB",
+    "CREATE TABLE bench_uow_child (id INT PRIMARY KEY AUTO_INCREMENT, parent_id INT NOT NULL, status VARCHAR(20)) ENGINE=InnoDB",
+]
+TEARDOWN = ["DROP TABLE IF EXISTS bench_uow_child", "DROP TABLE IF EXISTS bench_uow_parent"]
+
+
+def _global_status(conn, names):
+    cur = conn.cursor()
+    cur.execute("SHOW GLOBAL STATUS WHERE Variable_name IN (%s)" % ", ".join(["%s"] * len(names)), tuple(names))
+    data = {k: int(v) for k, v in cur.fetchall()}
+    cur.close()
+    return data
+
+
+def _write_pair(conn, i):
+    cur = conn.cursor()
+    cur.execute("INSERT INTO bench_uow_parent (email) VALUES (%s)", ("user%d@example.com" % i,))
+    cur.execute("INSERT INTO bench_uow_child (parent_id, status) VALUES (%s, %s)", (cur.lastrowid, "pending"))
+    cur.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    admin = mysql.connector.connect(**DB_CONFIG)
+    cur = admin.cursor()
+    for sql in SETUP:
+        cur.execute(sql)
+    cur.close()
+
+    conns = [mysql.connector.connect(**DB_CONFIG) for _ in range(args.threads)]
+    counters = ["Handler_commit", "Innodb_os_log_fsyncs"]
+
+    def autocommit(idx, i):
+        _write_pair(conns[idx], i)
+
+    def unit_of_work(idx, i):
+        with transaction(conns[idx]):
+            _write_pair(conns[idx], i)
+
+    try:
+        for label, worker in (("autocommit x2", autocommit), ("transaction()", unit_of_work)):
+            before = _global_status(admin, counters)
+            latencies, wall = run_threads(worker, args.threads, args.iterations)
+            after = _global_status(admin, counters)
+            n = len(latencies)
+            per_request = {k + "/req": round((after[k] - before[k]) / n, 2) for k in counters}
+            report(label, latencies, wall, per_request)
+    finally:
+        cur = admin.cursor()
+        for sql in TEARDOWN:
+            cur.execute(sql)
+        cur.close()
+        for conn in conns + [admin]:
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
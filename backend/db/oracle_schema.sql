@@ -0,0 +1,154 @@
+-- Oracle DDL equivalent of schema.sql (DB_DRIVER=oracle, Oracle XE 18c+)
+-- Identity primary keys, CLOB for LONGTEXT, JSON stored in CLOB with an IS JSON check.
+-- "COMMENT" is reserved in Oracle, so that column is quoted (app/oracle.py quotes it in queries).
+BEGIN
+  FOR t IN (SELECT table_name FROM user_tables WHERE table_name IN
+            ('APPROVALS','BLOG_REVISIONS','BLOG_VIEWS','BLOG_TRENDING','BLOG_RELATED','BLOG_SIGNATURES','BLOGS','QUIZZES','COURSES','DASHBOARD_STATS','REVOKED_TOKENS','VOLUNTEERS','EMPLOYEES')) LOOP
+    EXECUTE IMMEDIATE 'DROP TABLE ' || t.table_name || ' CASCADE CONSTRAINTS PURGE';
+  END LOOP;
+END;
+/
+
+-- Volunteers (authors / volunteer accounts)
+CREATE TABLE volunteers (
+  id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  email VARCHAR2(255) NOT NULL UNIQUE,
+  password VARCHAR2(255) NOT NULL,
+  name VARCHAR2(255),
+  phone VARCHAR2(50),
+  is_approved NUMBER(1) DEFAULT 0 NOT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+-- Employees (admins / staff)
+CREATE TABLE employees (
+  id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  email VARCHAR2(255) NOT NULL UNIQUE,
+  password VARCHAR2(255) NOT NULL,
+  name VARCHAR2(255),
+  role VARCHAR2(100),
+  phone VARCHAR2(50),
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+-- Courses
+CREATE TABLE courses (
+  id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  title VARCHAR2(400) NOT NULL,
+  description CLOB,
+  rating NUMBER(3,2) CHECK (rating >= 0 AND rating <= 5),
+  thumbnail_url VARCHAR2(1000),
+  video_url VARCHAR2(1000),
+  content CLOB,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  -- no ON UPDATE in Oracle: the update handlers set it (app/updates.py)
+  updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+-- Blogs (author references volunteers)
+CREATE TABLE blogs (
+  id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  title VARCHAR2(400) NOT NULL,
+  slug VARCHAR2(400) NOT NULL UNIQUE,
+  content CLOB,
+  content_html CLOB,
+  excerpt VARCHAR2(500),
+  word_count NUMBER DEFAULT 0 NOT NULL,
+  read_minutes NUMBER DEFAULT 1 NOT NULL,
+  image_url VARCHAR2(1000),
+  image_alt VARCHAR2(255),
+  image_caption VARCHAR2(500),
+  author_id NUMBER NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  CONSTRAINT fk_blogs_author FOREIGN KEY (author_id) REFERENCES volunteers(id) ON DELETE SET NULL
+);
+CREATE INDEX idx_blogs_author ON blogs(author_id);
+CREATE INDEX idx_blogs_created_id ON blogs(created_at, id);
+-- GET /blog/search (app/async_db.py search_blogs); Oracle Text indexes one column, so
+-- titles aren't searched here. Needs the CTXAPP role; synced on commit like InnoDB FULLTEXT.
+CREATE INDEX ft_blogs_content ON blogs(content) INDEXTYPE IS CTXSYS.CONTEXT PARAMETERS ('SYNC (ON COMMIT)');
+
+-- Blog revision history (app/revisions.py)
+CREATE TABLE blog_revisions (
+  id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  blog_id NUMBER NOT NULL,
+  revision NUMBER NOT NULL,
+  kind VARCHAR2(8) NOT NULL CHECK (kind IN ('snapshot','delta')),
+  body BLOB NOT NULL,
+  content_bytes NUMBER NOT NULL,
+  stored_bytes NUMBER NOT NULL,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  CONSTRAINT uq_blog_revision UNIQUE (blog_id, revision),
+  CONSTRAINT fk_revisions_blog FOREIGN KEY (blog_id) REFERENCES blogs(id) ON DELETE CASCADE
+);
+
+-- Blog view counts (app/view_counter.py)
+CREATE TABLE blog_views (
+  blog_id NUMBER PRIMARY KEY,
+  views NUMBER DEFAULT 0 NOT NULL
+);
+
+-- Trending scores (app/trending.py)
+CREATE TABLE blog_trending (
+  blog_id NUMBER PRIMARY KEY,
+  score BINARY_DOUBLE NOT NULL,
+  CONSTRAINT fk_trending_blog FOREIGN KEY (blog_id) REFERENCES blogs(id) ON DELETE CASCADE
+);
+CREATE INDEX idx_trending_score ON blog_trending (score);
+
+-- Related posts (app/related.py)
+CREATE TABLE blog_signatures (
+  blog_id NUMBER PRIMARY KEY,
+  signature RAW(128) NOT NULL,
+  CONSTRAINT fk_signatures_blog FOREIGN KEY (blog_id) REFERENCES blogs(id) ON DELETE CASCADE
+);
+
+CREATE TABLE blog_related (
+  blog_id NUMBER NOT NULL,
+  related_id NUMBER NOT NULL,
+  score BINARY_FLOAT NOT NULL,
+  CONSTRAINT pk_blog_related PRIMARY KEY (blog_id, related_id),
+  CONSTRAINT fk_related_blog FOREIGN KEY (blog_id) REFERENCES blogs(id) ON DELETE CASCADE,
+  CONSTRAINT fk_related_other FOREIGN KEY (related_id) REFERENCES blogs(id) ON DELETE CASCADE
+);
+CREATE INDEX idx_related_related ON blog_related (related_id);
+
+-- Approvals (volunteer approvals, admin who approved/rejected)
+CREATE TABLE approvals (
+  id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  volunteer_id NUMBER NOT NULL,
+  admin_id NUMBER NULL,
+  status VARCHAR2(10) DEFAULT 'pending' NOT NULL CHECK (status IN ('pending','approved','rejected')),
+  "COMMENT" CLOB,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  CONSTRAINT fk_approvals_volunteer FOREIGN KEY (volunteer_id) REFERENCES volunteers(id) ON DELETE CASCADE,
+  CONSTRAINT fk_approvals_admin FOREIGN KEY (admin_id) REFERENCES employees(id) ON DELETE SET NULL
+);
+CREATE INDEX idx_approvals_volunteer ON approvals(volunteer_id);
+CREATE INDEX idx_approvals_admin ON approvals(admin_id);
+
+-- Dashboard stats (simple key-value)
+CREATE TABLE dashboard_stats (
+  stat_key VARCHAR2(200) PRIMARY KEY,
+  stat_value CLOB
+);
+
+-- Quizzes (JSON kept in a CLOB with an IS JSON check)
+CREATE TABLE quizzes (
+  id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+  title VARCHAR2(400),
+  data CLOB CHECK (data IS JSON),
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  updated_at TIMESTAMP(6) DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+-- Revoked tokens (JWT jti store)
+CREATE TABLE revoked_tokens (
+  jti VARCHAR2(255) PRIMARY KEY,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+);
+
+CREATE INDEX idx_courses_title ON courses(title);
+
+COMMIT;
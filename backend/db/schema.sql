@@ -3,6 +3,11 @@
 -- create database finwise;
 -- use finwise;
 DROP TABLE IF EXISTS approvals;
+DROP TABLE IF EXISTS blog_revisions;
+DROP TABLE IF EXISTS blog_views;
+DROP TABLE IF EXISTS blog_trending;
+DROP TABLE IF EXISTS blog_related;
+DROP TABLE IF EXISTS blog_signatures;
 DROP TABLE IF EXISTS blogs;
 DROP TABLE IF EXISTS quizzes;
 DROP TABLE IF EXISTS courses;
@@ -42,7 +47,8 @@ CREATE TABLE courses (
   thumbnail_url VARCHAR(1000),
   video_url VARCHAR(1000),               -- URL to course video (nullable)
   content LONGTEXT,
-  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)   -- ETag / Last-Modified
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Blogs (author references volunteers)
@@ -51,16 +57,72 @@ CREATE TABLE blogs (
   title VARCHAR(400) NOT NULL,
   slug VARCHAR(400) NOT NULL UNIQUE,
   content LONGTEXT,
+  -- derived from content at write time (app/render.py)
+  content_html LONGTEXT,
+  excerpt VARCHAR(500),
+  word_count INT NOT NULL DEFAULT 0,
+  read_minutes SMALLINT NOT NULL DEFAULT 1,
   image_url VARCHAR(1000),         -- URL to blog image (nullable)
   image_alt VARCHAR(255),          -- alt text for accessibility
   image_caption VARCHAR(500),      -- optional caption/credit
   author_id INT NULL,
   created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
   INDEX (author_id),
+  INDEX idx_blogs_created_id (created_at, id),   -- GET /blog/ keyset pagination
+  FULLTEXT INDEX ft_blogs_title_content (title, content),   -- GET /blog/search
   CONSTRAINT fk_blogs_author FOREIGN KEY (author_id) REFERENCES volunteers(id)
     ON DELETE SET NULL ON UPDATE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- Blog revision history: zlib-compressed full snapshots / line deltas (app/revisions.py)
+CREATE TABLE blog_revisions (
+  id INT PRIMARY KEY AUTO_INCREMENT,
+  blog_id INT NOT NULL,
+  revision INT NOT NULL,
+  kind ENUM('snapshot','delta') NOT NULL,
+  body LONGBLOB NOT NULL,
+  content_bytes INT NOT NULL,      -- size of the content this revision rebuilds to
+  stored_bytes INT NOT NULL,       -- size of body
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  UNIQUE KEY uq_blog_revision (blog_id, revision),
+  CONSTRAINT fk_revisions_blog FOREIGN KEY (blog_id) REFERENCES blogs(id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- Blog view counts, written in batches by app/view_counter.py (kept out of blogs
+-- so counting never locks the rows readers and editors use)
+CREATE TABLE blog_views (
+  blog_id INT PRIMARY KEY,
+  views BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB;
+
+-- Trending scores, written in batches by app/trending.py: log2 of each blog's
+-- forward-decayed event weight, so the top K is an index range scan
+CREATE TABLE blog_trending (
+  blog_id INT PRIMARY KEY,
+  score DOUBLE NOT NULL,
+  KEY idx_trending_score (score),
+  CONSTRAINT fk_trending_blog FOREIGN KEY (blog_id) REFERENCES blogs(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+-- Related posts (app/related.py): a MinHash signature per blog and its
+-- precomputed nearest neighbours, read by primary-key prefix
+CREATE TABLE blog_signatures (
+  blog_id INT PRIMARY KEY,
+  signature VARBINARY(128) NOT NULL,
+  CONSTRAINT fk_signatures_blog FOREIGN KEY (blog_id) REFERENCES blogs(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
+CREATE TABLE blog_related (
+  blog_id INT NOT NULL,
+  related_id INT NOT NULL,
+  score FLOAT NOT NULL,
+  PRIMARY KEY (blog_id, related_id),
+  KEY idx_related_related (related_id),
+  CONSTRAINT fk_related_blog FOREIGN KEY (blog_id) REFERENCES blogs(id) ON DELETE CASCADE,
+  CONSTRAINT fk_related_other FOREIGN KEY (related_id) REFERENCES blogs(id) ON DELETE CASCADE
+) ENGINE=InnoDB;
+
 -- Approvals (volunteer approvals, admin who approved/rejected)
 CREATE TABLE approvals (
   id INT PRIMARY KEY AUTO_INCREMENT,
@@ -86,7 +148,8 @@ CREATE TABLE quizzes (
   id INT PRIMARY KEY AUTO_INCREMENT,
   title VARCHAR(400),
   data JSON,
-  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- Revoked tokens (JWT jti store)
@@ -1,6 +1,15 @@
 # app.py
 from flask import Flask, jsonify
-from app.utils import init_db_connection   # your connection helpers (from your snippet)
+from app.utils import init_app as init_db, pool_stats   # pooled connection helpers
+from app.statements import statement_stats
+from app.singleflight import stats as singleflight_stats
+from app.cache import blog_slugs, stats as cache_stats
+from app.updates import update_stats
+from app.view_counter import stats as view_counter_stats
+from app.trending import stats as trending_stats
+from app.related import stats as related_stats
+from app.async_db import stats as async_pool_stats
+from app.instrumentation import query_stats
 from app.volunteer import volunteer_bp  # blueprint file you created earlier
 from app.blog import blog_bp
 from app.course import course_bp
@@ -11,8 +20,8 @@ import os
 def create_app():
     app = Flask(__name__)
     app.secret_key = os.getenv("FLASK_SECRET_KEY", "change-me-replace-in-prod")
-    # initialize global DB connection (prints connection status)
-    init_db_connection()
+    # DB pool is created lazily per process; this wires per-request checkout/return
+    init_db(app)
 
     # register blueprints
     # volunteer_bp contains /register and /approve endpoints
@@ -27,6 +36,27 @@ def create_app():
     def index():
         return jsonify({"status": "ok", "service": "FinWise Backend"})
 
+    # connection pool stats (size / idle / in_use / waits / timeouts) + prepared statement reuse
+    # + how many reads were coalesced onto an identical in-flight query + result cache hits
+    @app.route("/health/db", methods=["GET"])
+    def db_health():
+        stats = pool_stats()
+        stats["async_pool"] = async_pool_stats()
+        stats["statements"] = statement_stats()
+        stats["coalescing"] = singleflight_stats()
+        stats["result_cache"] = cache_stats()
+        stats["blog_slugs"] = blog_slugs.stats()
+        stats["partial_updates"] = update_stats()
+        stats["view_counter"] = view_counter_stats()
+        stats["trending"] = trending_stats()
+        stats["related_posts"] = related_stats()
+        return jsonify(stats)
+
+    # per-statement / per-route latency histograms (slow ones also go to the slow-query log)
+    @app.route("/health/queries", methods=["GET"])
+    def query_health():
+        return jsonify(query_stats())
+
     return app
 
 if __name__ == "__main__":